@@ -0,0 +1,59 @@
+"""
+Бенчмарк часу старту: імпорт phonetic_analyzer, створення PhoneticAnalyzer
+та аналіз одного невеликого файлу. Показує, які ліниві компоненти
+(pronouncing, WordNet, G2P) реально були завантажені.
+
+Запуск: python benchmarks/bench_startup.py [шлях_до_txt] [--offline]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_TEXT = "The quick brown fox jumps over the lazy dog. She said it was fine."
+
+
+def run(sample_path=None, offline=None):
+    timings = {}
+
+    start = time.perf_counter()
+    import phonetic_analyzer
+    timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer = phonetic_analyzer.PhoneticAnalyzer(offline=offline)
+    timings["construct"] = time.perf_counter() - start
+
+    from main import process_text
+    from output_writer import OutputWriter
+    from reader import read_txt_file
+    from statistics_calculator import StatisticsCalculator
+    from syllabifier import Syllabifier
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if sample_path is None:
+            sample_path = os.path.join(tmp, "sample.txt")
+            with open(sample_path, "w", encoding="utf-8") as f:
+                f.write(SAMPLE_TEXT)
+        writer = OutputWriter(os.path.join(tmp, "out"))
+        start = time.perf_counter()
+        words = read_txt_file(sample_path)
+        process_text("sample", words, writer, StatisticsCalculator(writer.vowels),
+                     analyzer, Syllabifier())
+        timings["first_file"] = time.perf_counter() - start
+
+    timings["total"] = timings["import"] + timings["construct"] + timings["first_file"]
+    return {
+        "timings_sec": {k: round(v, 4) for k, v in timings.items()},
+        "loaded_components": analyzer.loaded_components(),
+        "offline": analyzer.offline,
+    }
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    result = run(args[0] if args else None, offline=True if "--offline" in sys.argv else None)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,89 @@
+"""
+Токенізатор: попередній шлях (декодування всього файлу + регулярний вираз
+над str) проти пошуку в байтах через mmap (reader.read_txt_file).
+Перевіряє, що токени однакові (також у потоковому режимі та по шматках,
+і для копії файлу в cp1252), і виводить час, МБ/с та пік пам'яті Python.
+
+Запуск: python benchmarks/bench_tokenizer.py ТЕКСТ_АБО_ПАПКА [повторів]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reader import (Reader, read_txt_file, stream_txt_file, split_file_chunks,
+                    read_chunk_tokens, detect_encoding, get_txt_files_in_folder)
+
+
+def regex_tokens(path, encoding="utf-8"):
+    with open(path, "r", encoding=encoding) as f:
+        return Reader(f.read()).tokenize()
+
+
+def measure(function, paths, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for path in paths:
+            function(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    for path in paths:
+        function(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def check(path, chunk_size=4096):
+    encoding = detect_encoding(path)
+    expected = regex_tokens(path, encoding)
+    chunks = [t for start, end in split_file_chunks(path, chunk_size)
+              for t in read_chunk_tokens(path, start, end, encoding)]
+    return (read_txt_file(path) == expected and list(stream_txt_file(path, 1000)) == expected
+            and chunks == expected)
+
+
+def check_cp1252(path, folder):
+    # Та сама копія в cp1252 (’ — байт 0x92): файл не UTF-8, токени мають збігтися.
+    # Вихідний файл читається у власному кодуванні (корпус може бути й не в UTF-8)
+    with open(path, "r", encoding=detect_encoding(path)) as f:
+        text = f.read()
+    copy = os.path.join(folder, "cp1252.txt")
+    with open(copy, "w", encoding="cp1252", errors="replace") as f:
+        f.write(text)
+    if "’" in text and detect_encoding(copy) != "cp1252":
+        return False
+    return check(copy)
+
+
+def run(source, repeats=3):
+    paths = sorted(get_txt_files_in_folder(source)) if os.path.isdir(source) else [source]
+    size = sum(os.path.getsize(p) for p in paths)
+    encodings = {p: detect_encoding(p) for p in paths}
+    ok = all(check(p) for p in paths)
+    folder = tempfile.mkdtemp()
+    try:
+        ok = all(check_cp1252(p, folder) for p in paths) and ok
+    finally:
+        shutil.rmtree(folder)
+    print(f"Токени однакові: {'так' if ok else 'НІ'}")
+
+    def regex_detected(path):
+        return regex_tokens(path, encodings[path])
+
+    for label, function in (("regex (str)", regex_detected), ("mmap (bytes)", read_txt_file)):
+        elapsed, peak = measure(function, paths, repeats)
+        print(f"{label:>13}: {elapsed:.3f} сек., {size / elapsed / 1e6:.1f} МБ/с, "
+              f"пік пам'яті {peak / 1e6:.1f} МБ")
+    return ok
+
+
+if __name__ == "__main__":
+    ok = run(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,53 @@
+"""
+Перевірка: статистика тексту, порахована частинами (шматки довільного
+розміру, у випадковому порядку, через dumps/loads), після merge
+збігається з StatisticsCalculator.compute для всього тексту.
+
+Запуск: python benchmarks/check_accumulator_merge.py ТЕКСТ_АБО_ПАПКА [кількість_частин]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import build_components
+from reader import read_txt_file, get_txt_files_in_folder
+from statistics_calculator import StatisticsAccumulator
+
+
+def run(source, parts=7, seed=0):
+    paths = get_txt_files_in_folder(source) if os.path.isdir(source) else [source]
+    components = build_components(os.getcwd())
+    calculator = components.stats_collector
+    rng = random.Random(seed)
+    ok = True
+    for path in sorted(paths):
+        words = read_txt_file(path)
+        analyses = [components.memo.analyze(w) for w in words]
+        expected = calculator.compute(
+            [p for a in analyses for p in a.phonemes],
+            [s for a in analyses for s in a.syllables],
+            [a.syllables for a in analyses],
+            [a.cvv for a in analyses])
+
+        cuts = sorted(rng.randint(0, len(words)) for _ in range(parts - 1))
+        bounds = list(zip([0] + cuts, cuts + [len(words)]))
+        rng.shuffle(bounds)
+        merged = calculator.accumulator()
+        for start, end in bounds:
+            partial = calculator.accumulator()
+            for a in analyses[start:end]:
+                partial.add_word(a.phonemes, a.syllables, a.cvv)
+            merged.merge(StatisticsAccumulator.loads(calculator, partial.dumps()))
+
+        same = merged.row() == expected
+        ok = ok and same
+        print(f"{os.path.basename(path)}: {'збігається' if same else 'РОЗБІЖНІСТЬ'}")
+    components.analyzer.close()
+    return ok
+
+
+if __name__ == "__main__":
+    ok = run(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 7)
+    sys.exit(0 if ok else 1)
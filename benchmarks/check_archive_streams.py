@@ -0,0 +1,90 @@
+"""
+Перевірка: якщо запис тексту в архів (ArchiveStreams) обривається винятком —
+напряму чи посеред потокової обробки тексту (process_text_stream), — обірваний
+запис не потрапляє ні в Outputs.jsonl, ні в індекс .idx, а попередні тексти
+лишаються доступними.
+
+Запуск: python benchmarks/check_archive_streams.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import build_components, process_text_stream
+from output_archive import ARCHIVE_NAME, INDEX_SUFFIX, OutputArchive, ArchiveReader
+from output_writer import OutputWriter
+
+WORDS = "the quick brown fox jumps over the lazy dog".split()
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupted_tokens(words, stop):
+    for i, word in enumerate(words):
+        if i == stop:
+            raise Interrupted(word)
+        yield word
+
+
+def archive_state(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    return data, ArchiveReader(path).index
+
+
+def check_direct(folder):
+    path = os.path.join(folder, "direct_" + ARCHIVE_NAME)
+    archive = OutputArchive(path)
+    archive.add("complete", ["a", "b", "c", "d", "e"])
+    archive.close()
+    before = archive_state(path)
+
+    archive = OutputArchive(path, append=True)
+    try:
+        with archive.open_streams("broken") as streams:
+            streams.add_block(["x", "y", "z", "u", "v"])
+            raise Interrupted("broken")
+    except Interrupted:
+        pass
+    archive.close()
+    return archive_state(path) == before
+
+
+def check_stream(folder, components):
+    path = os.path.join(folder, ARCHIVE_NAME)
+    writer = OutputWriter(folder, OutputArchive(path))
+    stats, memo = components.stats_collector, components.memo
+    process_text_stream("complete", iter(WORDS), writer, stats, memo)
+    try:
+        process_text_stream("broken", interrupted_tokens(WORDS, 5), writer, stats, memo)
+    except Interrupted:
+        pass
+    writer.archive.close()
+    reader = ArchiveReader(path)
+    with open(path, "rb") as f:
+        lines = f.read().splitlines()
+    return (reader.names() == ["complete"] and len(lines) == 1
+            and os.path.exists(path + INDEX_SUFFIX))
+
+
+def run():
+    folder = tempfile.mkdtemp()
+    components = build_components(folder)
+    try:
+        results = [("ArchiveStreams з винятком", check_direct(folder)),
+                   ("process_text_stream з винятком", check_stream(folder, components))]
+    finally:
+        components.analyzer.close()
+        shutil.rmtree(folder)
+    for label, same in results:
+        print(f"{label}: {'архів без змін' if same else 'ОБІРВАНИЙ ЗАПИС В АРХІВІ'}")
+    return all(same for _, same in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run() else 1)
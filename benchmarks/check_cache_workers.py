@@ -0,0 +1,92 @@
+"""
+Перевірка: кілька процесів одночасно пишуть в один постійний кеш
+(PronunciationCache) — жоден не падає з "database is locked", і в кеші
+опиняються записи всіх процесів. Потім те саме для main з воркерами
+й спільним cache_path: жоден файл не пропущено, кеш заповнено.
+
+Запуск: python benchmarks/check_cache_workers.py КОРПУС [процесів]
+"""
+import csv
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from pronunciation_cache import PronunciationCache
+from reader import get_txt_files_in_folder
+
+WORDS_PER_PROCESS = 3000
+VERSION = "check"
+# Коротке очікування блокування: процес, що тримає запис між комітами
+# (а не лише під час короткої транзакції), одразу дасть "database is locked"
+LOCK_TIMEOUT = 0.5
+
+
+def _writer(task):
+    path, worker = task
+    cache = PronunciationCache(path, VERSION, timeout=LOCK_TIMEOUT)
+    try:
+        for i in range(WORDS_PER_PROCESS):
+            word = f"w{worker}_{i}"
+            if cache.get(word) is None:
+                cache.put(word, ["W", "ER1", "D"], "g2p")
+            # Повільний «аналіз» між записами: транзакції процесів перетинаються
+            if i % 10 == 0:
+                time.sleep(0.01)
+        cache.close()
+        return None
+    except Exception as e:
+        return f"процес {worker}: {e}"
+
+
+def check_direct(folder, processes):
+    path = os.path.join(folder, "cache.db")
+    PronunciationCache(path, VERSION).close()
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        errors = [e for e in pool.map(_writer, [(path, w) for w in range(processes)]) if e]
+    cache = PronunciationCache(path, VERSION)
+    entries = len(cache)
+    cache.close()
+    ok = not errors and entries == processes * WORDS_PER_PROCESS
+    print(f"{processes} процесів: {entries} записів із {processes * WORDS_PER_PROCESS}, "
+          f"помилки: {errors or 'немає'}, {time.perf_counter() - start:.2f} сек.")
+    return ok
+
+
+def check_main(source, folder, processes):
+    cache_path = os.path.join(folder, "main_cache.db")
+    out = os.path.join(folder, "out")
+    messages = []
+    main.main(source, out, cache_path=cache_path, workers=processes,
+              stats_format="csv", log_callback=messages.append)
+    failed = [m for m in messages if "locked" in m]
+    with open(os.path.join(out, "Statistics.csv"), encoding="utf-8", newline="") as f:
+        texts = {row["Text"] for row in csv.DictReader(f)}
+    names = {os.path.splitext(os.path.basename(p))[0] for p in get_txt_files_in_folder(source)}
+    conn = sqlite3.connect(cache_path)
+    entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    conn.close()
+    ok = not failed and names <= texts and entries > 0
+    print(f"main, {processes} воркери: файлів у статистиці {len(names & texts)} із {len(names)}, "
+          f"записів кешу {entries}, помилки блокування: {failed or 'немає'}")
+    return ok
+
+
+def run(source, processes=4):
+    folder = tempfile.mkdtemp()
+    try:
+        return check_direct(folder, processes) and check_main(source, folder, processes)
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    ok = run(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,51 @@
+"""
+Перевірка: пакетний G2P (predict_batch — усі слова пакета проходять модель
+g2p_en разом) дає ті самі вимови, що й виклик G2p для кожного OOV-слова
+корпусу окремо. Також виводить час обох варіантів.
+
+Запуск: python benchmarks/check_g2p_batch_parity.py КОРПУС [розмір_пакета]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phonetic_analyzer import PhoneticAnalyzer, _g2p_batch
+from reader import stream_txt_file, get_txt_files_in_folder
+
+
+def run(source, batch_size=256):
+    paths = get_txt_files_in_folder(source) if os.path.isdir(source) else [source]
+    analyzer = PhoneticAnalyzer()
+    vocabulary = set()
+    for path in paths:
+        vocabulary.update(stream_txt_file(path))
+    words = sorted(analyzer.g2p_candidates(vocabulary), key=lambda w: (len(w), w))
+    g2p = analyzer.g2p
+
+    start = time.perf_counter()
+    expected = []
+    for word in words:
+        try:
+            expected.append(g2p(word))
+        except Exception:
+            expected.append([])
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = []
+    for i in range(0, len(words), batch_size):
+        batched.extend(_g2p_batch(g2p, words[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+
+    mismatches = [w for w, a, b in zip(words, expected, batched) if a != b]
+    print(f"OOV-слів: {len(words)}, розбіжностей: {len(mismatches)} {mismatches[:10]}")
+    print(f"по одному: {single:.3f} сек., пакетами по {batch_size}: {elapsed:.3f} сек.")
+    analyzer.close()
+    return not mismatches
+
+
+if __name__ == "__main__":
+    ok = run(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 256)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,61 @@
+"""
+Перевірка: швидкий режим розпізнавання (спершу точний пошук у CMU,
+лематизація лише при промаху) дає ті самі фонеми й рівні, що й режим
+сумісності, для кожного слова еталонного корпусу. Також виводить час
+обох режимів і кількість звернень до лематизатора.
+
+Запуск: python benchmarks/check_resolver_parity.py КОРПУС [компільований_лексикон]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phonetic_analyzer import PhoneticAnalyzer, RESOLVER_FAST, RESOLVER_COMPAT
+from reader import stream_txt_file, get_txt_files_in_folder
+
+
+def load_vocabulary(source):
+    paths = get_txt_files_in_folder(source) if os.path.isdir(source) else [source]
+    vocabulary = set()
+    for path in paths:
+        vocabulary.update(stream_txt_file(path))
+    return sorted(vocabulary)
+
+
+def resolve_all(words, mode, lexicon_path=None):
+    analyzer = PhoneticAnalyzer(lexicon_path=lexicon_path, resolver_mode=mode)
+    # G2P спільний для обох режимів і не входить у порівняння часу
+    candidates = analyzer.g2p_candidates(words)
+    analyzer.g2p_results.update((key, analyzer.g2p(key)) for key in candidates)
+    analyzer.lemma_table.clear()
+
+    start = time.perf_counter()
+    results = [analyzer.resolve(w) for w in words]
+    elapsed = time.perf_counter() - start
+    lemmatized = len(analyzer.lemma_table)
+    analyzer.close()
+    return results, elapsed, lemmatized
+
+
+def run(source, lexicon_path=None):
+    words = load_vocabulary(source)
+    expected, compat_time, compat_lemmas = resolve_all(words, RESOLVER_COMPAT, lexicon_path)
+    actual, fast_time, fast_lemmas = resolve_all(words, RESOLVER_FAST, lexicon_path)
+
+    mismatches = [i for i in range(len(words)) if actual[i] != expected[i]]
+    for i in mismatches[:10]:
+        print("Розбіжність:", words[i], expected[i], actual[i])
+    print(f"Слів: {len(words)}, розбіжностей: {len(mismatches)}")
+    print(f"Лематизовано: compat {compat_lemmas}, fast {fast_lemmas}")
+    print(f"Час: compat {compat_time:.3f} с, fast {fast_time:.3f} с")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Використання: python benchmarks/check_resolver_parity.py КОРПУС [ЛЕКСИКОН]")
+        sys.exit(1)
+    ok = run(sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,71 @@
+"""
+Перевірка: NumpyStatisticsCalculator повертає той самий рядок статистики,
+що й StatisticsCalculator.compute, на випадкових текстах зі словника CMU
+(разом із нестандартними символами на кшталт 'UNK') — і по токенах
+(compute_batch), і по типах слів з кратністю (compute_types, як у main.py).
+Виводить час усіх варіантів.
+
+Запуск: python benchmarks/check_statistics_parity.py [компільований_лексикон]
+"""
+import os
+import random
+import sys
+from collections import Counter
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from check_syllabifier_parity import load_pronunciations
+from output_writer import OutputWriter
+from statistics_calculator import StatisticsCalculator
+from statistics_numpy import NumpyStatisticsCalculator
+from syllabifier import Syllabifier
+
+ODD_WORDS = [['UNK'], ['Z'], ['K', 'S', 'T'], ['HH', 'M', 'M']]
+
+
+def run(lexicon_path=None, texts=20, words_per_text=20000, seed=0):
+    rng = random.Random(seed)
+    prons = load_pronunciations(lexicon_path) + ODD_WORDS
+    syllabifier = Syllabifier()
+    vowels = OutputWriter("").vowels
+    reference = StatisticsCalculator(vowels)
+    vectorized = NumpyStatisticsCalculator(vowels, table=syllabifier.table)
+
+    ok = True
+    reference_time = vectorized_time = types_time = 0.0
+    for t in range(texts):
+        words = [rng.choice(prons) for _ in range(rng.randint(0, words_per_text))]
+        syllables_by_word = [syllabifier.syllabify(w) for w in words]
+        phonemes = [p for w in words for p in w]
+        syllables = [s for word_sylls in syllables_by_word for s in word_sylls]
+
+        start = time.perf_counter()
+        expected = reference.compute(phonemes, syllables, syllables_by_word)
+        reference_time += time.perf_counter() - start
+
+        batch = syllabifier.syllabify_batch(words)
+        start = time.perf_counter()
+        actual = vectorized.compute_batch(batch)
+        vectorized_time += time.perf_counter() - start
+
+        counts = Counter(tuple(w) for w in words)
+        codes = [syllabifier.syllabify_coded(list(w))[1:] for w in counts]
+        start = time.perf_counter()
+        by_types = vectorized.compute_types(codes, list(counts.values()))
+        types_time += time.perf_counter() - start
+
+        for label, row in (("compute_batch", actual), ("compute_types", by_types)):
+            if row != expected or list(row) != list(expected):
+                ok = False
+                diff = {k: (expected.get(k), row.get(k))
+                        for k in set(expected) | set(row) if expected.get(k) != row.get(k)}
+                print(f"Текст {t}, {label}: розбіжність {diff}")
+    print(f"Текстів: {texts}; збіг: {'так' if ok else 'ні'}")
+    print(f"Час: compute {reference_time:.3f} с, compute_batch (numpy) {vectorized_time:.3f} с, "
+          f"compute_types (numpy) {types_time:.3f} с")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run(sys.argv[1] if len(sys.argv) > 1 else None) else 1)
@@ -0,0 +1,57 @@
+"""
+Перевірка: цілочисловий Syllabifier.syllabify і syllabify_batch дають
+той самий результат, що й еталонний syllabify_reference, для кожної
+вимови повного словника CMU. Також виводить час обох варіантів.
+
+Запуск: python benchmarks/check_syllabifier_parity.py [компільований_лексикон]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from syllabifier import Syllabifier
+
+
+def load_pronunciations(lexicon_path=None):
+    if lexicon_path:
+        from lexicon import CompiledLexicon
+        lex = CompiledLexicon(lexicon_path)
+        prons = [pron for word in lex.keys() for pron in lex[word]]
+        lex.close()
+        return prons
+    import nltk
+    return [pron for prons in nltk.corpus.cmudict.dict().values() for pron in prons]
+
+
+def run(lexicon_path=None):
+    prons = load_pronunciations(lexicon_path)
+    syllabifier = Syllabifier()
+
+    start = time.perf_counter()
+    expected = [syllabifier.syllabify_reference(p) for p in prons]
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [syllabifier.syllabify(p) for p in prons]
+    coded_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = syllabifier.syllabify_batch(prons)
+    batch_time = time.perf_counter() - start
+
+    mismatches = [i for i in range(len(prons)) if actual[i] != expected[i]]
+    batch_mismatches = [i for i in range(len(prons)) if batch.word_syllables(i) != expected[i]]
+    for i in (mismatches + batch_mismatches)[:10]:
+        print("Розбіжність:", " ".join(prons[i]), expected[i], actual[i])
+    print(f"Вимов: {len(prons)}")
+    print(f"Розбіжностей syllabify: {len(mismatches)}, syllabify_batch: {len(batch_mismatches)}")
+    print(f"Час: еталон {reference_time:.3f} с, syllabify {coded_time:.3f} с, "
+          f"syllabify_batch {batch_time:.3f} с")
+    return not mismatches and not batch_mismatches
+
+
+if __name__ == "__main__":
+    ok = run(sys.argv[1] if len(sys.argv) > 1 else None)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,101 @@
+"""
+Перевірка рядів ковзних вікон: рядок кожного вікна (WindowStatistics,
+інкрементальне оновлення) збігається з StatisticsCalculator.compute для
+слів цього вікна, хвіст тексту потрапляє в завершальне неповне вікно, а ряд
+однаковий при додаванні слів по одному (потоковий режим), усім текстом і
+шматками довільного розміру. Також виводить час побудови ряду для різних розмірів
+вікна: він має залежати від довжини тексту, а не від розміру вікна.
+
+Запуск: python benchmarks/check_window_parity.py ТЕКСТ_АБО_ПАПКА [вікно] [крок]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import build_components
+from reader import read_txt_file, get_txt_files_in_folder
+from statistics_calculator import WindowSeries, WindowStatistics, fill_text_fields
+
+# Розміри вікна для заміру часу (з однаковим кроком, тож і кількість вікон однакова)
+TIMING_WINDOWS = (100, 1000, 10000, 100000)
+TIMING_STRIDE = 1000
+
+
+def expected_row(calculator, name, words, analyses):
+    phonemes = [p for a in analyses for p in a.phonemes]
+    syllables = [s for a in analyses for s in a.syllables]
+    row = calculator.compute(phonemes, syllables, [a.syllables for a in analyses],
+                             [a.cvv for a in analyses])
+    return fill_text_fields(row, name, sum(len(w) for w in words), len(phonemes), len(syllables))
+
+
+def check_text(calculator, name, words, analyses, window, stride):
+    series = WindowSeries(calculator, window, stride)
+    series.add_text(name, words, analyses)
+    rows = series.pop(name)
+
+    one_by_one = WindowStatistics(calculator, window, stride, name=name)
+    for word, analysis in zip(words, analyses):
+        one_by_one.add(word, analysis)
+    pieces = WindowStatistics(calculator, window, stride, name=name)
+    rng = random.Random(window)
+    cuts = sorted(rng.randint(0, len(words)) for _ in range(5))
+    for start, end in zip([0] + cuts, cuts + [len(words)]):
+        pieces.add_words(words[start:end], analyses[start:end])
+    if one_by_one.finish() != rows or pieces.finish() != rows:
+        return False
+    # Повні вікна плюс завершальне неповне, якщо після них лишились неохоплені слова
+    full = max(0, (len(words) - window) // series.stride + 1)
+    covered = (full - 1) * series.stride + window if full else 0
+    next_start = full * series.stride
+    expected_count = full + (len(words) > max(covered, next_start))
+    if len(rows) != expected_count:
+        return False
+    if expected_count > full and rows[-1]["End"] != len(words):
+        return False
+    for i, row in enumerate(rows):
+        start, end = row.pop("Start") - 1, row.pop("End")
+        del row["Window"]
+        if row.pop("Words") != end - start or (i < full and end - start != window):
+            return False
+        if row != expected_row(calculator, name, words[start:end], analyses[start:end]):
+            return False
+    return True
+
+
+def run(source, window=50, stride=20):
+    paths = get_txt_files_in_folder(source) if os.path.isdir(source) else [source]
+    components = build_components(os.getcwd())
+    calculator = components.stats_collector
+    ok = True
+    longest = ([], [])
+    for path in sorted(paths):
+        name = os.path.splitext(os.path.basename(path))[0]
+        words = read_txt_file(path)
+        analyses = [components.memo.analyze(w) for w in words]
+        same = all(check_text(calculator, name, words, analyses, w, s)
+                   for w, s in ((window, stride), (window, window), (stride, window)))
+        ok = ok and same
+        print(f"{name}: {'збігається' if same else 'РОЗБІЖНІСТЬ'}")
+        if len(words) > len(longest[0]):
+            longest = (words, analyses)
+
+    words, analyses = longest
+    for size in TIMING_WINDOWS:
+        series = WindowSeries(calculator, size, TIMING_STRIDE)
+        start = time.perf_counter()
+        series.add_text("timing", words, analyses)
+        elapsed = time.perf_counter() - start
+        print(f"вікно {size}: {len(series.pop('timing'))} вікон, {elapsed:.3f} сек. "
+              f"на {len(words)} слів")
+    components.analyzer.close()
+    return ok
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[2:4]]
+    ok = run(sys.argv[1], *args)
+    sys.exit(0 if ok else 1)
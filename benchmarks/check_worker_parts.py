@@ -0,0 +1,100 @@
+"""
+Перевірка: після запуску з воркерами у вихідній папці не лишається частин
+архіву чи індексу (*.part-<pid>) — ні з --archive / --index, ні без них,
+зокрема для шарда корпусу (--shard) і при поділі файлів (split_files).
+Службові файли SQLite (*.part-<pid>-journal) не вважаються частинами, а
+після скасування в архів та індекс потрапляють лише тексти зі статистики.
+
+Запуск: python benchmarks/check_worker_parts.py КОРПУС [воркерів]
+"""
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from output_archive import ARCHIVE_NAME, PART_SUFFIX, ArchiveReader
+from phonetic_index import INDEX_NAME, PhoneticIndex
+
+CASES = [
+    ("шард без індексу", {"shard": "1/2"}),
+    ("шард з індексом і архівом", {"shard": "1/2", "index": True, "archive": True}),
+    ("без індексу", {}),
+    ("з індексом", {"index": True}),
+    ("поділ файлів з індексом", {"split_files": True, "index": True, "chunk_size": 4096}),
+]
+
+
+def leftover_parts(folder):
+    return sorted(entry for entry in os.listdir(folder) if PART_SUFFIX in entry)
+
+
+def check_part_names():
+    folder = tempfile.mkdtemp()
+    try:
+        entries = ["12", "12-journal", "12-wal", "abc", "12.bak"]
+        for suffix in entries:
+            open(os.path.join(folder, INDEX_NAME + PART_SUFFIX + suffix), "wb").close()
+        parts = [os.path.basename(p) for p in main.worker_parts(folder, INDEX_NAME)]
+        leftovers = [os.path.basename(p)
+                     for p in main.worker_parts(folder, INDEX_NAME, leftovers=True)]
+    finally:
+        shutil.rmtree(folder)
+    ok = (parts == [INDEX_NAME + PART_SUFFIX + "12"]
+          and leftovers == [INDEX_NAME + PART_SUFFIX + s for s in ("12", "12-journal", "12-wal")])
+    print(f"імена частин: {'точний збіг' if ok else 'ЗАЙВІ: ' + ', '.join(parts)}")
+    return ok
+
+
+def check_cancel(source, workers):
+    folder = tempfile.mkdtemp()
+    cancel = threading.Event()
+
+    def progress(done, total):
+        if done:
+            cancel.set()
+
+    try:
+        main.main(source, folder, workers=workers, stats_format="csv", archive=True, index=True,
+                  progress_callback=progress, cancel_event=cancel)
+        with open(os.path.join(folder, "Statistics.csv"), encoding="utf-8", newline="") as f:
+            texts = {row["Text"] for row in csv.DictReader(f)}
+        archived = set(ArchiveReader(os.path.join(folder, ARCHIVE_NAME)).names())
+        index = PhoneticIndex(os.path.join(folder, INDEX_NAME))
+        indexed = {name for name, _ in index.texts()}
+        index.close()
+        parts = leftover_parts(folder)
+    finally:
+        shutil.rmtree(folder)
+    extra = sorted((archived | indexed) - texts)
+    ok = not extra and not parts
+    print(f"скасування: {len(texts)} текстів у статистиці, "
+          f"{'архів та індекс узгоджені' if ok else 'ЗАЙВІ: ' + ', '.join(extra + parts)}")
+    return ok
+
+
+def run(source, workers=2):
+    ok = check_part_names()
+    for label, options in CASES:
+        folder = tempfile.mkdtemp()
+        try:
+            main.main(source, folder, workers=workers, stats_format="csv", **options)
+            parts = leftover_parts(folder)
+            expected = [name for name, flag in ((ARCHIVE_NAME, "archive"), (INDEX_NAME, "index"))
+                        if options.get(flag) and not os.path.exists(os.path.join(folder, name))]
+        finally:
+            shutil.rmtree(folder)
+        same = not parts and not expected
+        ok = ok and same
+        details = ", ".join(parts + [f"немає {name}" for name in expected])
+        print(f"{label}: {'чисто' if same else 'ЗАЛИШКИ: ' + details}")
+    return check_cancel(source, workers) and ok
+
+
+if __name__ == "__main__":
+    ok = run(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 2)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,188 @@
+"""
+Відтворюваний бенчмарк продуктивності з часом кожного етапу.
+
+Генерує синтетичний корпус офлайн (слова з лексикону із Zipf-розподілом,
+контрольована частка OOV-слів і скорочень, задана кількість і розмір файлів),
+вимірює окремо етапи (токенізація, лематизація, пошук у CMU, G2P,
+поділ на склади, статистика, запис файлів; завантаження WordNet і моделі
+G2P — окремими етапами lemmatize_load і g2p_load) та наскрізний запуск main.main,
+а також токени/с і піковий RSS. Результат — JSON; з --baseline порівнює
+з попереднім результатом і повертає код 1 при регресії.
+
+Запуск:
+  python benchmarks/run_benchmarks.py --files 20 --words 5000 --oov-rate 0.02 \
+      --output bench.json [--baseline old_bench.json --tolerance 0.2] [--lexicon lexicon.bin]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONTRACTION_SUFFIXES = ["n't", "'ll", "'ve", "'re", "'d", "'m", "'s"]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux повертає КБ, macOS — байти
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def generate_corpus(folder, vocabulary, files, words_per_file, oov_rate, contraction_rate, seed):
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    for i in range(files):
+        tokens = []
+        for word in rng.choices(vocabulary, weights=weights, k=words_per_file):
+            r = rng.random()
+            if r < oov_rate:
+                word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+            elif r < oov_rate + contraction_rate:
+                word = word + rng.choice(CONTRACTION_SUFFIXES)
+            tokens.append(word)
+        with open(os.path.join(folder, f"text_{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write(" ".join(tokens))
+
+
+def timed(timings, stage, func):
+    start = time.perf_counter()
+    result = func()
+    timings[stage] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run(args):
+    from main import main as run_main, build_components
+    from reader import get_txt_files_in_folder, read_txt_file
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "corpus")
+        os.makedirs(corpus)
+
+        components = timed(timings, "startup", lambda: build_components(
+            os.path.join(tmp, "stages"), lexicon_path=args.lexicon, offline=args.offline))
+        analyzer = components.analyzer
+        vocabulary = sorted(k for k in analyzer.cmu.keys() if k.isalpha())[:args.vocabulary]
+        generate_corpus(corpus, vocabulary, args.files, args.words, args.oov_rate,
+                        args.contraction_rate, args.seed)
+        paths = sorted(get_txt_files_in_folder(corpus))
+
+        # --- Окремі етапи ---
+        texts = timed(timings, "tokenize", lambda: [read_txt_file(p) for p in paths])
+        tokens = sum(len(t) for t in texts)
+        types = sorted({analyzer.normalize(w) for t in texts for w in t})
+
+        # Ліниві ресурси (WordNet, модель G2P і тегер NLTK) завантажуються
+        # окремими етапами *_load: створення компонента плюс один пробний
+        # виклик, — тож час lemmatize і g2p однаково не включає завантаження
+        def load_lemmatizer():
+            analyzer.lemmatizer.lemmatize("warming", pos='v')
+        timed(timings, "lemmatize_load", load_lemmatizer)
+
+        def lemmatize():
+            lemmatizer = analyzer.lemmatizer
+            for key in types:
+                lemmatizer.lemmatize(lemmatizer.lemmatize(key, pos='v'), pos='n')
+        timed(timings, "lemmatize", lemmatize)
+        timed(timings, "cmu_lookup", lambda: [key in analyzer.cmu for key in types])
+
+        oov = sorted(analyzer.g2p_candidates(types))
+        timed(timings, "g2p_load", lambda: analyzer.g2p("warming"))
+        timed(timings, "g2p", lambda: [analyzer.g2p(key) for key in oov])
+
+        phonemes = {key: analyzer.get_phonetic(key) for key in types}
+        timed(timings, "syllabify", lambda: [
+            components.syllabifier.syllabify(ph) for ph in phonemes.values()])
+
+        analyses = [[components.memo.analyze(w) for w in t] for t in texts]
+
+        def statistics():
+            for text in analyses:
+                components.stats_collector.compute(
+                    [p for a in text for p in a.phonemes],
+                    [s for a in text for s in a.syllables],
+                    [a.syllables for a in text],
+                    [a.cvv for a in text])
+        timed(timings, "statistics", statistics)
+
+        def write():
+            for i, text in enumerate(analyses):
+                components.writer.write_text_outputs(f"text_{i:05d}", text)
+        timed(timings, "write", write)
+        analyzer.close()
+
+        # --- Наскрізний запуск ---
+        timed(timings, "end_to_end", lambda: run_main(
+            corpus, os.path.join(tmp, "e2e"), workers=args.workers,
+            lexicon_path=args.lexicon, offline=args.offline))
+
+    return {
+        "params": {
+            "files": args.files, "words_per_file": args.words, "oov_rate": args.oov_rate,
+            "contraction_rate": args.contraction_rate, "vocabulary": args.vocabulary,
+            "seed": args.seed, "workers": args.workers, "lexicon": bool(args.lexicon),
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "counts": {"tokens": tokens, "types": len(types), "g2p_words": len(oov)},
+        "timings_sec": timings,
+        "tokens_per_sec": round(tokens / timings["end_to_end"], 1) if timings["end_to_end"] else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def check_regression(result, baseline, tolerance):
+    """
+    Список етапів, що стали повільнішими за baseline більш ніж на tolerance.
+    """
+    regressions = []
+    for stage, old in baseline.get("timings_sec", {}).items():
+        new = result["timings_sec"].get(stage)
+        if new is not None and old > 0 and new > old * (1 + tolerance):
+            regressions.append({"stage": stage, "baseline": old, "current": new,
+                                "ratio": round(new / old, 3)})
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк фонетичного аналізатора")
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--words", type=int, default=5000, help="слів у файлі")
+    parser.add_argument("--oov-rate", type=float, default=0.02)
+    parser.add_argument("--contraction-rate", type=float, default=0.02)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--lexicon", help="компільований лексикон")
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--output", help="куди записати JSON з результатом")
+    parser.add_argument("--baseline", help="JSON попереднього запуску для перевірки регресій")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = run(args)
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        result["regressions"] = check_regression(result, baseline, args.tolerance)
+        exit_code = 1 if result["regressions"] else 0
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    sys.exit(exit_code)
@@ -0,0 +1,393 @@
+"""
+Фоновий сервіс: тримає завантаженими PhoneticAnalyzer, Syllabifier та
+StatisticsCalculator (з усіма лінивими компонентами — WordNet, pronouncing, G2P)
+і приймає завдання через HTTP на localhost, тож час завдання — лише сам аналіз.
+
+Запуск: python daemon.py [--port 8765] [--engines 2] [--max-pending 100]
+                         [--lexicon lexicon.bin] [--cache cache.db] [--offline]
+
+API (JSON):
+  POST /jobs               {"input": файл_або_папка, "output": папка}
+                           або {"text": текст, "name": назва, "output": папка}
+                           (назва — ім'я файлу без шляху);
+                           необов'язково: stream, chunk_size, stats_format, incremental,
+                           archive, encodings, index, window, window_stride
+                           → 202 {"id": ...}; 503, якщо черга заповнена
+  GET  /jobs               список завдань
+  GET  /jobs/<id>          стан, прогрес і лог завдання
+  GET  /jobs/<id>/events   потік подій (по одному JSON на рядок) до завершення завдання
+  POST /jobs/<id>/cancel   скасування між файлами
+  GET  /status             кількість рушіїв і завдань за станами
+"""
+import argparse
+import itertools
+import json
+import os
+import queue
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from main import main as run_main, build_components
+from word_memo import DEFAULT_MEMO_SIZE
+
+DEFAULT_PORT = 8765
+DEFAULT_ENGINES = 2
+DEFAULT_MAX_PENDING = 100
+# Скільки завершених завдань пам'ятати для GET /jobs/<id>
+MAX_FINISHED_JOBS = 200
+# Параметри main.main, які можна передати в завданні
+JOB_OPTIONS = ("stream", "chunk_size", "stats_format", "incremental", "archive", "encodings",
+               "index", "window", "window_stride")
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+
+class JobError(ValueError):
+    """
+    Некоректне завдання (відповідь 400).
+    """
+
+
+class QueueFull(RuntimeError):
+    """
+    Черга завдань заповнена (відповідь 503).
+    """
+
+
+def warm_up(components):
+    """
+    Завантажує ліниві компоненти заздалегідь, щоб перше завдання не чекало.
+    """
+    analyzer = components.analyzer
+    analyzer.pronouncing
+    analyzer.lemmatizer
+    analyzer.g2p
+    return components
+
+
+class EnginePool:
+    """
+    Обмежений набір теплих компонентів; кожен рушій одночасно
+    використовує лише одне завдання (аналізатор і кеш не потокобезпечні).
+    Рушії тримають окремі з'єднання з одним файлом кешу: PronunciationCache
+    пише короткими транзакціями, тож одночасні завдання не блокують одне одного.
+    """
+    def __init__(self, size, **options):
+        self.size = size
+        self._free = queue.Queue()
+        for _ in range(size):
+            # Вихідна папка рушія не використовується: main підставляє свою
+            self._free.put(warm_up(build_components(os.getcwd(), **options)))
+
+    @contextmanager
+    def engine(self):
+        components = self._free.get()
+        try:
+            yield components
+        finally:
+            if components.analyzer.cache is not None:
+                components.analyzer.cache.flush()
+            self._free.put(components)
+
+    def close(self):
+        for _ in range(self.size):
+            self._free.get().analyzer.close()
+
+
+class Job:
+    def __init__(self, job_id, request):
+        self.id = job_id
+        self.request = request
+        self.status = STATUS_QUEUED
+        self.error = None
+        self.done = 0
+        self.total = 0
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.events = []
+        self.cancel_event = threading.Event()
+        self._changed = threading.Condition()
+
+    def post(self, event):
+        with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def wait_events(self, since, timeout=1.0):
+        """
+        Події, починаючи з індексу since (чекає на нові до timeout секунд).
+        """
+        with self._changed:
+            if len(self.events) <= since and self.status not in FINISHED_STATUSES:
+                self._changed.wait(timeout)
+            return self.events[since:]
+
+    def set_status(self, status, error=None):
+        self.status = status
+        self.error = error
+        if status == STATUS_RUNNING:
+            self.started = time.time()
+        elif status in FINISHED_STATUSES:
+            self.finished = time.time()
+        self.post({"type": "status", "status": status, "error": error})
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "done": self.done,
+            "total": self.total,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+    def details(self):
+        result = self.summary()
+        result["request"] = self.request
+        result["log"] = [e["message"] for e in self.events if e["type"] == "log"]
+        return result
+
+
+def validate_name(name):
+    # Назва тексту стає ім'ям файлу в тимчасовій папці завдання:
+    # лише одна компонента шляху, без переходів нагору
+    if not isinstance(name, str):
+        raise JobError("name має бути рядком")
+    separators = [sep for sep in (os.sep, os.altsep, "/", "\\") if sep]
+    if (any(sep in name for sep in separators) or name in (".", "..")
+            or "\0" in name or os.path.isabs(name)):
+        raise JobError(f"Некоректна назва тексту: {name!r}")
+
+
+def validate_request(request):
+    if not isinstance(request, dict):
+        raise JobError("Очікується JSON-об'єкт")
+    if not request.get("output"):
+        raise JobError("Не вказано output")
+    if ("input" in request) == ("text" in request):
+        raise JobError("Потрібно вказати або input, або text")
+    if "input" in request and not os.path.exists(request["input"]):
+        raise JobError(f"Вхідний шлях не існує: {request['input']}")
+    if request.get("name"):
+        validate_name(request["name"])
+    unknown = set(request) - {"input", "text", "name", "output"} - set(JOB_OPTIONS)
+    if unknown:
+        raise JobError(f"Невідомі параметри: {', '.join(sorted(unknown))}")
+
+
+class JobManager:
+    def __init__(self, engines, max_pending=DEFAULT_MAX_PENDING, lexicon_path=None):
+        self.engines = engines
+        self.max_pending = max_pending
+        self.lexicon_path = lexicon_path
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=engines.size)
+
+    def submit(self, request):
+        validate_request(request)
+        with self._lock:
+            pending = sum(1 for j in self.jobs.values() if j.status not in FINISHED_STATUSES)
+            if pending >= self.max_pending:
+                raise QueueFull(f"Черга заповнена ({pending} завдань)")
+            job = Job(str(next(self._ids)), request)
+            self.jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j.status in FINISHED_STATUSES]
+        for job in sorted(finished, key=lambda j: j.finished)[:-MAX_FINISHED_JOBS or None]:
+            del self.jobs[job.id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return [job.summary() for job in self.jobs.values()]
+
+    def status(self):
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"engines": self.engines.size, "jobs": counts}
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job.set_status(STATUS_CANCELLED)
+            return
+
+        def log(message):
+            job.post({"type": "log", "message": message})
+
+        def progress(done, total):
+            job.done, job.total = done, total
+            job.post({"type": "progress", "done": done, "total": total})
+
+        request = job.request
+        options = {key: request[key] for key in JOB_OPTIONS if key in request}
+        try:
+            with self.engines.engine() as components:
+                job.set_status(STATUS_RUNNING)
+                os.makedirs(request["output"], exist_ok=True)
+                if "text" in request:
+                    with tempfile.TemporaryDirectory() as tmp:
+                        path = os.path.join(tmp, (request.get("name") or "text") + ".txt")
+                        with open(path, "w", encoding="utf-8") as f:
+                            f.write(request["text"])
+                        run_main(path, request["output"], log_callback=log,
+                                 progress_callback=progress, cancel_event=job.cancel_event,
+                                 components=components, lexicon_path=self.lexicon_path,
+                                 **options)
+                else:
+                    run_main(request["input"], request["output"], log_callback=log,
+                             progress_callback=progress, cancel_event=job.cancel_event,
+                             components=components, lexicon_path=self.lexicon_path, **options)
+        except Exception as e:
+            job.set_status(STATUS_FAILED, str(e))
+            return
+        job.set_status(STATUS_CANCELLED if job.cancel_event.is_set() else STATUS_DONE)
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            job.cancel_event.set()
+        self._executor.shutdown(wait=True)
+        self.engines.close()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, manager):
+        super().__init__(address, DaemonHandler)
+        self.manager = manager
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, code, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_or_404(self, job_id):
+        job = self.server.manager.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"Завдання {job_id} не знайдено"})
+        return job
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        manager = self.server.manager
+        if parts == ["status"]:
+            self._send_json(200, manager.status())
+        elif parts == ["jobs"]:
+            self._send_json(200, manager.list())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._send_json(200, job.details())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._stream_events(job)
+        else:
+            self._send_json(404, {"error": "Невідомий шлях"})
+
+    def do_POST(self):
+        parts = self.path.strip("/").split("/")
+        manager = self.server.manager
+        if parts == ["jobs"]:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length).decode("utf-8"))
+                job = manager.submit(request)
+            except (ValueError, JobError) as e:
+                self._send_json(400, {"error": str(e)})
+            except QueueFull as e:
+                self._send_json(503, {"error": str(e)})
+            else:
+                self._send_json(202, {"id": job.id})
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                job.cancel_event.set()
+                self._send_json(200, job.summary())
+        else:
+            self._send_json(404, {"error": "Невідомий шлях"})
+
+    def _stream_events(self, job):
+        # Без Content-Length: відповідь закінчується закриттям з'єднання
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        sent = 0
+        while True:
+            finished = job.status in FINISHED_STATUSES
+            events = job.wait_events(sent)
+            for event in events:
+                self.wfile.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            sent += len(events)
+            if finished and not events:
+                break
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Фоновий сервіс фонетичного аналізатора")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--engines", type=int, default=DEFAULT_ENGINES,
+                        help="кількість одночасних завдань (кожне — з власним аналізатором)")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING)
+    parser.add_argument("--lexicon", help="компільований лексикон (спільний для рушіїв через mmap)")
+    parser.add_argument("--cache", help="постійний кеш транскрипцій (SQLite)")
+    parser.add_argument("--memo-size", type=int, default=DEFAULT_MEMO_SIZE)
+    parser.add_argument("--offline", action="store_true")
+    return parser.parse_args(argv)
+
+
+def serve(args):
+    start = time.time()
+    engines = EnginePool(args.engines, cache_path=args.cache, memo_size=args.memo_size,
+                         offline=args.offline or None, lexicon_path=args.lexicon)
+    manager = JobManager(engines, args.max_pending, lexicon_path=args.lexicon)
+    server = DaemonServer((args.host, args.port), manager)
+    print(f"Рушіїв: {args.engines}, готово за {round(time.time() - start, 3)} сек.")
+    print(f"Слухаю http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    serve(parse_args())
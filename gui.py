@@ -1,25 +1,64 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
+from tkinter import filedialog, messagebox, scrolledtext, ttk
 import os
+import queue
 import threading
+import time
+import multiprocessing
 from main import main as run_main  # тепер очікує log_callback
 
-def run_analysis(input_path, output_path, status_label, console_text):
+# Робочий потік не чіпає віджети: події йдуть у чергу, яку головний цикл Tk
+# розбирає пакетами кожні POLL_INTERVAL_MS
+POLL_INTERVAL_MS = 100
+MAX_EVENTS_PER_POLL = 1000
+# Скільки рядків лишати в консолі (старші видаляються)
+MAX_CONSOLE_LINES = 5000
+CANCEL_STATUS = "Скасування після поточного файлу..."
+
+def run_analysis(input_path, output_path, events, cancel_event):
     """
-    Викликає run_main з log_callback, який вставляє повідомлення у console_text.
+    Викликає run_main у робочому потоці; повідомлення логу, прогрес
+    і завершення передаються подіями в чергу events.
     """
-    def log_to_console(msg):
-        console_text.configure(state="normal")
-        console_text.insert(tk.END, msg + "\n")
-        console_text.see(tk.END)
-        console_text.configure(state="disabled")
+    def log_to_queue(msg):
+        events.put(("log", msg))
+
+    def progress_to_queue(done, total):
+        events.put(("progress", done, total))
 
     try:
-        run_main(input_path, output_path, log_callback=log_to_console)
-        status_label.config(text="Аналіз завершено успішно.")
+        run_main(input_path, output_path, log_callback=log_to_queue,
+                 progress_callback=progress_to_queue, cancel_event=cancel_event)
+        events.put(("finished", None))
     except Exception as e:
-        status_label.config(text="Помилка")
-        messagebox.showerror("Помилка", str(e))
+        events.put(("finished", str(e)))
+
+def drain_events(events, limit=MAX_EVENTS_PER_POLL):
+    batch = []
+    try:
+        while len(batch) < limit:
+            batch.append(events.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def progress_text(done, total, processed, elapsed, cancelling=False):
+    """
+    processed — файлів, оброблених за elapsed секунд (без пропущених
+    незмінених, які з'являються одразу й спотворили б швидкість).
+    cancelling — скасування вже запитано: замість оцінки часу статус скасування.
+    """
+    text = f"Оброблено {done} з {total} файлів"
+    if cancelling:
+        return f"{text}. {CANCEL_STATUS}"
+    if processed and elapsed > 0:
+        rate = processed / elapsed
+        text += f", {rate:.2f} файл/с, залишилось ~{format_duration((total - done) / rate)}"
+    return text
 
 def browse_input_file(entry):
     path = filedialog.askopenfilename(
@@ -64,8 +103,53 @@ def start_gui():
     status_label = tk.Label(window, text="")
     status_label.grid(row=2, column=0, columnspan=3, sticky="w", padx=5)
 
-    console_text = scrolledtext.ScrolledText(window, width=80, height=25, state="disabled")
-    console_text.grid(row=3, column=0, columnspan=3, padx=5, pady=5)
+    progress_bar = ttk.Progressbar(window, orient="horizontal", length=660, mode="determinate")
+    progress_bar.grid(row=3, column=0, columnspan=3, padx=5)
+
+    console_text = scrolledtext.ScrolledText(window, width=80, height=23, state="disabled")
+    console_text.grid(row=4, column=0, columnspan=3, padx=5, pady=5)
+
+    events = queue.Queue()
+    job = {"thread": None, "cancel": None, "start": 0.0, "base": None}
+
+    def append_console(lines):
+        console_text.configure(state="normal")
+        console_text.insert(tk.END, "\n".join(lines) + "\n")
+        extra = int(console_text.index("end-1c").split(".")[0]) - MAX_CONSOLE_LINES
+        if extra > 0:
+            console_text.delete("1.0", f"{extra + 1}.0")
+        console_text.see(tk.END)
+        console_text.configure(state="disabled")
+
+    def poll_events():
+        lines = []
+        for event in drain_events(events):
+            kind = event[0]
+            if kind == "log":
+                lines.append(event[1])
+            elif kind == "progress":
+                done, total = event[1], event[2]
+                if job["base"] is None:
+                    job["base"] = done
+                progress_bar.config(maximum=max(total, 1), value=done)
+                status_label.config(text=progress_text(done, total, done - job["base"],
+                                                       time.time() - job["start"],
+                                                       job["cancel"].is_set()))
+            elif kind == "finished":
+                error = event[1]
+                job["thread"] = None
+                start_button.config(state="normal")
+                cancel_button.config(state="disabled")
+                if error is not None:
+                    status_label.config(text="Помилка")
+                    messagebox.showerror("Помилка", error)
+                elif job["cancel"].is_set():
+                    status_label.config(text="Аналіз скасовано.")
+                else:
+                    status_label.config(text="Аналіз завершено успішно.")
+        if lines:
+            append_console(lines)
+        window.after(POLL_INTERVAL_MS, poll_events)
 
     def on_start():
         input_path_val = input_entry.get().strip()
@@ -84,17 +168,37 @@ def start_gui():
         console_text.configure(state="normal")
         console_text.delete("1.0", tk.END)
         console_text.configure(state="disabled")
+        progress_bar.config(value=0)
 
         status_label.config(text="Аналіз виконується...")
-        thread = threading.Thread(
+        start_button.config(state="disabled")
+        cancel_button.config(state="normal")
+        job["cancel"] = threading.Event()
+        job["start"] = time.time()
+        job["base"] = None
+        job["thread"] = threading.Thread(
             target=run_analysis,
-            args=(input_path_val, output_path_val, status_label, console_text)
+            args=(input_path_val, output_path_val, events, job["cancel"]),
+            daemon=True
         )
-        thread.start()
-
-    tk.Button(window, text="Старт", command=on_start).grid(row=4, column=1, pady=10)
-
+        job["thread"].start()
+
+    def on_cancel():
+        if job["thread"] is not None:
+            job["cancel"].set()
+            cancel_button.config(state="disabled")
+            status_label.config(text=CANCEL_STATUS)
+
+    buttons = tk.Frame(window)
+    buttons.grid(row=5, column=1, pady=10)
+    start_button = tk.Button(buttons, text="Старт", command=on_start)
+    start_button.pack(side="left", padx=5)
+    cancel_button = tk.Button(buttons, text="Скасувати", command=on_cancel, state="disabled")
+    cancel_button.pack(side="left", padx=5)
+
+    window.after(POLL_INTERVAL_MS, poll_events)
     window.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     start_gui()
@@ -0,0 +1,61 @@
+"""
+Попередньо обчислена таблиця словоформа → лема (WordNet, як у
+PhoneticAnalyzer.lemma) для слів корпусу, яких немає в CMU. З таблицею
+аналізатору не потрібно завантажувати WordNet для вже відомих форм.
+
+Формат: UTF-8, рядки "словоформа<TAB>лема".
+Збірка: python lemma_table.py ВХІДНА_ПАПКА_АБО_ФАЙЛ ВИХІДНИЙ_ФАЙЛ [ЛЕКСИКОН]
+"""
+import os
+import sys
+
+
+def load_lemma_table(path):
+    table = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line:
+                surface, lemma = line.split("\t")
+                table[surface] = lemma
+    return table
+
+
+def save_lemma_table(path, table):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for surface in sorted(table):
+            f.write(f"{surface}\t{table[surface]}\n")
+    os.replace(tmp_path, path)
+
+
+def build_lemma_table(words, analyzer):
+    """
+    Леми для нормалізованих слів, яких немає в CMU
+    (лише для них швидкий режим звертається до лематизатора).
+    """
+    table = {}
+    for word in words:
+        key = analyzer.normalize(word)
+        if key not in table and key not in analyzer.cmu:
+            table[key] = analyzer.lemma(key)
+    return table
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Використання: python lemma_table.py ВХІДНА_ПАПКА_АБО_ФАЙЛ ВИХІДНИЙ_ФАЙЛ [ЛЕКСИКОН]")
+        sys.exit(1)
+    from phonetic_analyzer import PhoneticAnalyzer
+    from reader import stream_txt_file, get_txt_files_in_folder
+
+    source = sys.argv[1]
+    paths = get_txt_files_in_folder(source) if os.path.isdir(source) else [source]
+    vocabulary = set()
+    for path in paths:
+        vocabulary.update(stream_txt_file(path))
+    analyzer = PhoneticAnalyzer(lexicon_path=sys.argv[3] if len(sys.argv) == 4 else None)
+    table = build_lemma_table(vocabulary, analyzer)
+    analyzer.close()
+    save_lemma_table(sys.argv[2], table)
+    print(f"Записано {len(table)} лем у {sys.argv[2]}")
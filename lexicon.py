@@ -0,0 +1,235 @@
+"""
+Компільований лексикон: CMUdict (NLTK) + додаткові записи pronouncing
+в одному компактному бінарному файлі, який процеси відкривають через mmap
+лише для читання (сторінки спільні між усіма воркерами).
+
+Збірка: python lexicon.py ВИХІДНИЙ_ФАЙЛ
+"""
+import array
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from phoneme_codes import PhonemeTable
+
+MAGIC = b"PHLEX\x00\x01\x00"
+# n_words, n_prons, n_phones, n_slots, symbols_len, words_len, reserved x2
+HEADER = struct.Struct("<8I")
+
+# Джерело запису: основний CMU-словник або лише бібліотека pronouncing
+SOURCE_CMU = 0
+SOURCE_PRONOUNCING = 1
+
+_EMPTY = 0xFFFFFFFF
+
+
+def _pad4(n):
+    return (4 - n % 4) % 4
+
+
+def _uint32_array(values):
+    arr = array.array("I", values)
+    if arr.itemsize != 4:
+        raise RuntimeError("Непідтримувана платформа: array('I') не 32-бітний")
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def compile_lexicon(path, cmu=None, pronouncing_lookup=None):
+    """
+    Компілює лексикон у файл path.
+    cmu — словник слово → список вимов (за замовчуванням nltk cmudict.dict());
+    pronouncing_lookup — словник слово → список рядків фонем
+    (за замовчуванням дані бібліотеки pronouncing). З pronouncing беруться
+    лише слова, яких немає в cmu, — саме так працює рівень pronouncing.
+    Повертає кількість слів.
+    """
+    if cmu is None:
+        import nltk
+        cmu = nltk.corpus.cmudict.dict()
+    if pronouncing_lookup is None:
+        import pronouncing
+        pronouncing.init_cmu()
+        pronouncing_lookup = pronouncing.lookup
+
+    entries = {}
+    for word, prons in cmu.items():
+        entries[word] = (SOURCE_CMU, [list(p) for p in prons])
+    for word, prons in pronouncing_lookup.items():
+        if word not in entries and prons:
+            entries[word] = (SOURCE_PRONOUNCING, [p.split() for p in prons])
+
+    table = PhonemeTable()
+    words = sorted(entries, key=lambda w: w.encode("utf-8"))
+    word_offsets = [0]
+    words_blob = bytearray()
+    entry_prons = [0]
+    pron_offsets = [0]
+    phones = bytearray()
+    sources = bytearray()
+    for word in words:
+        source, prons = entries[word]
+        words_blob += word.encode("utf-8")
+        word_offsets.append(len(words_blob))
+        for pron in prons:
+            phones.extend(table.encode(pron))
+            pron_offsets.append(len(phones))
+        entry_prons.append(len(pron_offsets) - 1)
+        sources.append(source)
+    if len(table) > 255:
+        raise ValueError("Забагато різних фонем для 8-бітних ID")
+
+    # Хеш-таблиця з відкритою адресацією: crc32(слово) → індекс запису
+    n_slots = 1
+    while n_slots < 2 * len(words):
+        n_slots *= 2
+    slots = [_EMPTY] * n_slots
+    mask = n_slots - 1
+    for idx, word in enumerate(words):
+        h = zlib.crc32(word.encode("utf-8")) & mask
+        while slots[h] != _EMPTY:
+            h = (h + 1) & mask
+        slots[h] = idx
+
+    symbols_blob = "\n".join(table.symbols).encode("ascii")
+    sections = [
+        symbols_blob,
+        _uint32_array(word_offsets).tobytes(),
+        bytes(words_blob),
+        _uint32_array(entry_prons).tobytes(),
+        _uint32_array(pron_offsets).tobytes(),
+        _uint32_array(slots).tobytes(),
+        bytes(phones),
+        bytes(sources),
+    ]
+    header = HEADER.pack(len(words), len(pron_offsets) - 1, len(phones), n_slots,
+                         len(symbols_blob), len(words_blob), 0, 0)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(header)
+        for section in sections:
+            f.write(section)
+            f.write(b"\x00" * _pad4(len(section)))
+    os.replace(tmp_path, path)
+    return len(words)
+
+
+class CompiledLexicon:
+    """
+    Лексикон, відображений у пам'ять (mmap, лише читання).
+    Підтримує інтерфейс словника CMU: `word in lex`, `lex[word]`, `lex.get(word)`
+    — лише для записів з CMU; записи pronouncing доступні через pronouncing_phones().
+    """
+    def __init__(self, path):
+        if sys.byteorder == "big":
+            raise RuntimeError("Компільований лексикон підтримується лише на little-endian")
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: не є файлом компільованого лексикону")
+        (self.n_words, n_prons, n_phones, n_slots,
+         symbols_len, words_len, _, _) = HEADER.unpack_from(self._mm, len(MAGIC))
+
+        view = memoryview(self._mm)
+        pos = len(MAGIC) + HEADER.size
+
+        def take(length):
+            nonlocal pos
+            section = view[pos:pos + length]
+            pos += length + _pad4(length)
+            return section
+
+        self.symbols = bytes(take(symbols_len)).decode("ascii").split("\n")
+        self._word_offsets = take(4 * (self.n_words + 1)).cast("I")
+        self._words = take(words_len)
+        self._entry_prons = take(4 * (self.n_words + 1)).cast("I")
+        self._pron_offsets = take(4 * (n_prons + 1)).cast("I")
+        self._slots = take(4 * n_slots).cast("I")
+        self._phones = take(n_phones)
+        self._sources = take(self.n_words)
+        self._mask = n_slots - 1
+
+    def close(self):
+        for name in ("_word_offsets", "_words", "_entry_prons", "_pron_offsets",
+                     "_slots", "_phones", "_sources"):
+            section = getattr(self, name, None)
+            if section is not None:
+                section.release()
+                setattr(self, name, None)
+        self._mm.close()
+        self._file.close()
+
+    def _find(self, word):
+        key = word.encode("utf-8")
+        h = zlib.crc32(key) & self._mask
+        slots = self._slots
+        offsets = self._word_offsets
+        while True:
+            idx = slots[h]
+            if idx == _EMPTY:
+                return -1
+            if self._words[offsets[idx]:offsets[idx + 1]] == key:
+                return idx
+            h = (h + 1) & self._mask
+
+    def _prons(self, idx):
+        symbols = self.symbols
+        phones = self._phones
+        offsets = self._pron_offsets
+        return [
+            [symbols[p] for p in phones[offsets[i]:offsets[i + 1]]]
+            for i in range(self._entry_prons[idx], self._entry_prons[idx + 1])
+        ]
+
+    def __contains__(self, word):
+        idx = self._find(word)
+        return idx >= 0 and self._sources[idx] == SOURCE_CMU
+
+    def __getitem__(self, word):
+        idx = self._find(word)
+        if idx < 0 or self._sources[idx] != SOURCE_CMU:
+            raise KeyError(word)
+        return self._prons(idx)
+
+    def get(self, word, default=None):
+        try:
+            return self[word]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """
+        Слова з CMU (без додаткових записів pronouncing), як у dict.keys().
+        """
+        offsets = self._word_offsets
+        for idx in range(self.n_words):
+            if self._sources[idx] == SOURCE_CMU:
+                yield bytes(self._words[offsets[idx]:offsets[idx + 1]]).decode("utf-8")
+
+    def pronouncing_phones(self, word):
+        """
+        Вимови з бібліотеки pronouncing для слів, яких немає в CMU
+        (аналог pronouncing.phones_for_word, але списками фонем).
+        """
+        idx = self._find(word.lower())
+        if idx < 0 or self._sources[idx] != SOURCE_PRONOUNCING:
+            return []
+        return self._prons(idx)
+
+    def __len__(self):
+        return self.n_words
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Використання: python lexicon.py ВИХІДНИЙ_ФАЙЛ")
+        sys.exit(1)
+    count = compile_lexicon(sys.argv[1])
+    print(f"Скомпільовано {count} слів у {sys.argv[1]}")
@@ -1,94 +1,791 @@
+import argparse
 import os
+import re
 import time
-from reader import read_txt_file, get_txt_files_in_folder
-from phonetic_analyzer import PhoneticAnalyzer
+import multiprocessing
+from collections import Counter, namedtuple
+from reader import (read_txt_file, stream_txt_file, iter_files, parse_shard, in_shard,
+                    split_file_chunks, read_chunk_tokens, detect_encoding, byte_scanner,
+                    DEFAULT_CHUNK_SIZE)
+from phonetic_analyzer import PhoneticAnalyzer, lexicon_version, RESOLVER_FAST
 from syllabifier import Syllabifier
-from statistics_calculator import StatisticsCalculator
-from output_writer import OutputWriter
-
-def process_text(name, words, writer, stats_collector, analyzer, syllabifier):
-    phonemes_by_word = {w: analyzer.get_phonetic(w) for w in words}
-    syllables_by_word = {w: syllabifier.syllabify(phonemes_by_word[w]) for w in words}
-
-    writer.write_transcription(name, [(w, phonemes_by_word[w]) for w in words])
-    writer.write_syllables(name, [(w, syllables_by_word[w]) for w in words])
-    writer.write_syllables_cvv(name, [(w, syllables_by_word[w]) for w in words])
-    writer.write_first_syllables(name, [(w, syllables_by_word[w]) for w in words])
-    writer.write_first_syllables_cvv(name, [(w, syllables_by_word[w]) for w in words])
-
-    all_phonemes = [ph for w in words for ph in phonemes_by_word[w]]
-    all_syllables = [s for w in words for s in syllables_by_word[w]]
-    syllables_by_word_list = [syllables_by_word[w] for w in words]
-
-    row = stats_collector.compute(all_phonemes, all_syllables, syllables_by_word_list)
-    row["Text"] = name
-    row["Length"] = sum(len(w) for w in words)
-    row["PhonemeCount"] = len(all_phonemes)
-    total_syllables = sum(len(syllables_by_word[w]) for w in words)
-    row["SyllablesCount"] = total_syllables
-    if total_syllables:
-        row["AverageSyllables"] = round(len(all_phonemes) / total_syllables, 5)
+from statistics_calculator import (StatisticsCalculator, StatisticsAccumulator, WindowSeries,
+                                   fill_text_fields)
+from output_writer import OutputWriter, format_block
+from output_archive import OutputArchive, ARCHIVE_NAME, PART_SUFFIX
+from phonetic_index import IndexWriter, TextIndexer, INDEX_NAME
+from pipeline import prefetch, OrderedWriteQueue
+from word_memo import WordMemo, DEFAULT_MEMO_SIZE
+from run_manifest import RunManifest, file_digest
+from resolver_metrics import ResolverMetrics, METRICS_NAME
+from statistics_export import FORMATS, merge_statistics
+
+SKIPPED_ENCODING = "Пропущено (не вдалося декодувати в жодному з кодувань)"
+
+def analyze_words(name, words, stats_collector, memo):
+    """
+    Аналіз тексту без запису файлів: (WordAnalysis кожного слова, рядок статистики).
+    """
+    # Кожен тип слова аналізується один раз (спільний memo на весь запуск)
+    analysis_by_word = {}
+    for w in words:
+        if w not in analysis_by_word:
+            analysis_by_word[w] = memo.analyze(w)
+    analyses = [analysis_by_word[w] for w in words]
+
+    if stats_collector.vectorized:
+        # Закодовані слова беруться з memo: кожен тип один раз, з кратністю
+        counts = Counter(words)
+        types = [analysis_by_word[w] for w in counts]
+        multiplicity = list(counts.values())
+        row = stats_collector.compute_types([a.codes for a in types], multiplicity)
+        phoneme_total = sum(len(a.phonemes) * n for a, n in zip(types, multiplicity))
+        syllable_total = sum(len(a.syllables) * n for a, n in zip(types, multiplicity))
+        return analyses, fill_text_fields(row, name, sum(len(w) for w in words),
+                                          phoneme_total, syllable_total)
+
+    accumulator = stats_collector.accumulator()
+    accumulate_types(accumulator, words, analysis_by_word)
+    return analyses, accumulator.text_row(name)
+
+def accumulate_types(accumulator, words, analysis_by_word):
+    # Статистика накопичується по типах слів (з кратністю), а не по токенах
+    for w, count in Counter(words).items():
+        a = analysis_by_word[w]
+        accumulator.add_word(a.phonemes, a.syllables, a.cvv, len(w), count)
+
+def process_text(name, words, writer, stats_collector, analyzer, syllabifier, memo=None):
+    if memo is None:
+        memo = WordMemo(analyzer, syllabifier, stats_collector.vowels)
+    analyses, row = analyze_words(name, words, stats_collector, memo)
+    write_text(writer, name, words, analyses)
+    return row
+
+def write_text(writer, name, words, analyses):
+    # Вихідні файли тексту та (якщо ведуться) фонетичний індекс і ряд вікон
+    writer.write_text_outputs(name, analyses)
+    if writer.index is not None:
+        writer.index.add_text(name, words, analyses)
+    if writer.windows is not None:
+        writer.windows.add_text(name, words, analyses)
+
+def process_text_stream(name, tokens, writer, stats_collector, memo):
+    """
+    Потоковий варіант process_text: токени споживаються по одному,
+    вихідні файли та статистика накопичуються інкрементально,
+    тож пам'ять не залежить від розміру тексту.
+    """
+    accumulator = stats_collector.accumulator()
+    indexer = writer.index.open_text(name) if writer.index is not None else None
+    windows = writer.windows.open_text(name) if writer.windows is not None else None
+    with writer.open_streams(name) as streams:
+        for w in tokens:
+            analysis = memo.analyze(w)
+            streams.add(analysis.phonemes, analysis.syllables, analysis.cvv)
+            accumulator.add_word(analysis.phonemes, analysis.syllables, analysis.cvv, len(w))
+            if indexer is not None:
+                indexer.add(w, analysis)
+            if windows is not None:
+                windows.add(w, analysis)
+    if indexer is not None:
+        indexer.close()
+    if windows is not None:
+        windows.close()
+
+    return accumulator.text_row(name)
+
+def prefetch_oov(files_to_process, analyzer, batch_size, workers, log_callback=None,
+                 encodings=None):
+    """
+    Перша фаза двофазного режиму: збирає словник усіх файлів
+    і пакетно проганяє OOV-слова через G2P.
+    """
+    vocabulary = set()
+    for path in files_to_process:
+        try:
+            vocabulary.update(stream_txt_file(path, encodings=encodings))
+        except Exception:
+            # Помилки читання буде залоговано у другій фазі
+            continue
+    start = time.time()
+    count = analyzer.prefetch_g2p(vocabulary, batch_size=batch_size, workers=workers)
+    if log_callback:
+        log_callback(f"G2P: пакетно оброблено {count} OOV-слів за {round(time.time() - start, 3)} сек.")
+
+Components = namedtuple(
+    "Components", ["analyzer", "syllabifier", "writer", "stats_collector", "memo"]
+)
+
+def build_components(output_path, cache_path=None, memo_size=DEFAULT_MEMO_SIZE, offline=None,
+                     lexicon_path=None, stats_backend="python", resolver_mode=RESOLVER_FAST,
+                     lemma_table_path=None):
+    analyzer = PhoneticAnalyzer(cache_path=cache_path, offline=offline, lexicon_path=lexicon_path,
+                                resolver_mode=resolver_mode, lemma_table_path=lemma_table_path)
+    syllabifier = Syllabifier()
+    writer = OutputWriter(output_path)
+    if stats_backend == "numpy":
+        from statistics_numpy import NumpyStatisticsCalculator
+        stats_collector = NumpyStatisticsCalculator(vowels=writer.vowels, table=syllabifier.table)
     else:
-        row["AverageSyllables"] = 0.0
+        stats_collector = StatisticsCalculator(vowels=writer.vowels)
+    memo = WordMemo(analyzer, syllabifier, writer.vowels, maxsize=memo_size)
+    return Components(analyzer, syllabifier, writer, stats_collector, memo)
+
+def analyze_file(path, file_label, components, log, stream=False, chunk_size=DEFAULT_CHUNK_SIZE,
+                 name=None, encodings=None):
+    """
+    Читає та обробляє один файл. Повертає рядок статистики або None,
+    якщо файл пропущено через помилку (повідомлення йде у log).
+    stream — потокова обробка шматками по chunk_size символів.
+    name — назва тексту у вихідних файлах (за замовчуванням — ім'я файлу
+    без розширення; для вкладених тек — відносний шлях через "/").
+    encodings — кодування файлу, що пробуються по черзі (reader.DEFAULT_ENCODINGS).
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    # Метрики рівнів розпізнавання ведуться окремо для кожного файлу
+    metrics = components.analyzer.metrics
+    metrics.begin_file(name)
+    try:
+        if stream:
+            return _analyze_file_stream(path, name, file_label, components, log, chunk_size,
+                                        encodings)
+        return _analyze_file_text(path, name, file_label, components, log, encodings)
+    finally:
+        metrics.end_file()
+
+def _analyze_file_text(path, name, file_label, components, log, encodings=None):
+    try:
+        file_start = time.time()
+        words = read_txt_file(path, encodings)
+    except UnicodeDecodeError:
+        log(f"{file_label} {SKIPPED_ENCODING}")
+        return None
+    except Exception as e:
+        log(f"{file_label} Помилка при читанні: {e}")
+        return None
 
+    log(f"{file_label} Початок обробки")
+    try:
+        row = process_text(name, words, components.writer, components.stats_collector,
+                           components.analyzer, components.syllabifier, components.memo)
+    except Exception as e:
+        log(f"{file_label} Помилка при обробці: {e}")
+        return None
+    duration = round(time.time() - file_start, 3)
+    log(f"{file_label} Час обробки {duration} сек.")
     return row
 
-def main(input_path, output_path, log_callback=None):
+def _analyze_file_stream(path, name, file_label, components, log, chunk_size, encodings=None):
+    file_start = time.time()
+    try:
+        tokens = stream_txt_file(path, chunk_size, encodings)
+    except UnicodeDecodeError:
+        log(f"{file_label} {SKIPPED_ENCODING}")
+        return None
+    except Exception as e:
+        log(f"{file_label} Помилка при читанні: {e}")
+        return None
+
+    log(f"{file_label} Початок обробки")
+    try:
+        row = process_text_stream(name, tokens, components.writer,
+                                  components.stats_collector, components.memo)
+    except Exception as e:
+        log(f"{file_label} Помилка при обробці: {e}")
+        return None
+    duration = round(time.time() - file_start, 3)
+    log(f"{file_label} Час обробки {duration} сек.")
+    return row
+
+def analyze_files_pipelined(tasks, components, log, finish_file, cancelled,
+                            prefetch_files=2, write_threads=2, max_pending_writes=4):
+    """
+    Послідовна обробка файлів конвеєром: читання наперед у фоновому потоці,
+    аналіз у поточному потоці, запис п'яти вихідних файлів у пулі потоків.
+    tasks — пари (індекс, завдання) у порядку обробки. Повідомлення логу
+    кожного файлу видаються разом і в тому ж порядку, що й без конвеєра;
+    finish_file(індекс, рядок) викликається після завершення запису.
+    """
+    writer = components.writer
+    metrics = components.analyzer.metrics
+
+    def read(entry):
+        return read_txt_file(entry[1][0], entry[1][5])
+
+    def write(payload):
+        write_text(writer, *payload)
+
+    def done(context, error):
+        i, file_label, row, messages, file_start = context
+        if error is not None:
+            messages.append(f"{file_label} Помилка при обробці: {error}")
+            row = None
+        elif row is not None:
+            messages.append(f"{file_label} Час обробки {round(time.time() - file_start, 3)} сек.")
+        for message in messages:
+            log(message)
+        finish_file(i, row)
+
+    with OrderedWriteQueue(write, done, write_threads, max_pending_writes) as writes:
+        for (i, task), words, error in prefetch(tasks, read, prefetch_files):
+            if cancelled():
+                break
+            file_label, name = task[1], task[4]
+            file_start = time.time()
+            if isinstance(error, UnicodeDecodeError):
+                writes.submit(None, (i, file_label, None, [f"{file_label} {SKIPPED_ENCODING}"], 0))
+                continue
+            if error is not None:
+                messages = [f"{file_label} Помилка при читанні: {error}"]
+                writes.submit(None, (i, file_label, None, messages, 0))
+                continue
+
+            messages = [f"{file_label} Початок обробки"]
+            metrics.begin_file(name)
+            try:
+                analyses, row = analyze_words(name, words, components.stats_collector,
+                                              components.memo)
+            except Exception as e:
+                messages.append(f"{file_label} Помилка при обробці: {e}")
+                writes.submit(None, (i, file_label, None, messages, 0))
+                continue
+            finally:
+                metrics.end_file()
+            writes.submit((name, words, analyses), (i, file_label, row, messages, file_start))
+
+# Стан процесу-воркера: компоненти створюються один раз при старті
+_worker_components = None
+
+def worker_parts(output_path, base_name, leftovers=False):
+    """
+    Частини архіву або індексу base_name, які пишуть процеси-воркери
+    (рівно <base_name>.part-<pid>). leftovers — також службові файли
+    SQLite поруч із частинами (-journal, -wal, -shm), що лишаються
+    після скасування чи падіння воркера.
+    """
+    pattern = re.escape(base_name + PART_SUFFIX) + r"\d+"
+    if leftovers:
+        pattern += "(-journal|-wal|-shm)?"
+    if not os.path.isdir(output_path):
+        return []
+    return sorted(os.path.join(output_path, entry) for entry in os.listdir(output_path)
+                  if re.fullmatch(pattern, entry))
+
+def _init_worker(output_path, cache_path, memo_size, offline, lexicon_path, stats_backend,
+                 resolver_mode, lemma_table_path, g2p_results, archive=False, index=False,
+                 windows=None):
+    """
+    windows — (вікно, крок) рядів ковзних вікон: рядки повертаються
+    батьківському процесу разом з рядком статистики.
+    """
+    global _worker_components
+    _worker_components = build_components(output_path, cache_path, memo_size, offline,
+                                          lexicon_path, stats_backend, resolver_mode,
+                                          lemma_table_path)
+    if archive or index or windows:
+        # Кожен воркер пише власні частини архіву та індексу (main зливає їх після пулу)
+        suffix = f"{PART_SUFFIX}{os.getpid()}"
+        part_archive = part_index = series = None
+        if archive:
+            part_archive = OutputArchive(os.path.join(output_path, ARCHIVE_NAME + suffix))
+        if index:
+            part_index = IndexWriter(os.path.join(output_path, INDEX_NAME + suffix))
+        if windows:
+            series = WindowSeries(StatisticsCalculator(vowels=_worker_components.writer.vowels),
+                                  *windows)
+        writer = OutputWriter(output_path, part_archive, part_index, series)
+        _worker_components = _worker_components._replace(writer=writer)
+    _worker_components.analyzer.g2p_results.update(g2p_results)
+
+def _worker_analyze_file(task):
+    path, file_label, stream, chunk_size, name, encodings = task
+    messages = []
+    # Свіжі метрики на кожен файл: батьківський процес об'єднує знімки
+    _worker_components.analyzer.metrics = ResolverMetrics()
+    cache = _worker_components.analyzer.cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    row = analyze_file(path, file_label, _worker_components, messages.append, stream, chunk_size,
+                       name, encodings)
+    series = _worker_components.writer.windows
+    window_rows = series.pop(name) if series is not None else None
+    cache_delta = (0, 0)
+    if cache is not None:
+        cache.flush()
+        cache_delta = (cache.hits - hits, cache.misses - misses)
+    return (row, messages, cache_delta, _worker_components.analyzer.metrics.snapshot(),
+            window_rows)
+
+def _worker_analyze_chunk(task):
+    """
+    Один шматок великого файлу (див. analyze_file_chunked): токенізація,
+    аналіз, готові фрагменти п'яти вихідних файлів і частинна статистика.
+    """
+    path, name, start, end, encoding, index, windows = task
+    components = _worker_components
+    analyzer = components.analyzer
+    analyzer.metrics = ResolverMetrics()
+    analyzer.metrics.begin_file(name)
+    cache = analyzer.cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+    words = read_chunk_tokens(path, start, end, encoding)
+    analysis_by_word = {}
+    for w in words:
+        if w not in analysis_by_word:
+            analysis_by_word[w] = components.memo.analyze(w)
+    texts = format_block([analysis_by_word[w] for w in words])
+    accumulator = components.stats_collector.accumulator()
+    accumulate_types(accumulator, words, analysis_by_word)
+    index_partial = None
+    if index:
+        indexer = TextIndexer()
+        indexer.add_words(words, [analysis_by_word[w] for w in words])
+        index_partial = indexer.partial()
+    # Вікна перетинають межі шматків — їх рахує батьківський процес по порядку
+    window_partial = (words, analysis_by_word) if windows else None
+
+    analyzer.metrics.end_file()
+    cache_delta = (0, 0)
+    if cache is not None:
+        cache.flush()
+        cache_delta = (cache.hits - hits, cache.misses - misses)
+    return (texts, accumulator.to_dict(), cache_delta, analyzer.metrics.snapshot(), index_partial,
+            window_partial)
+
+def analyze_file_chunked(pool, path, file_label, name, writer, calculator, log,
+                         chunk_size=DEFAULT_CHUNK_SIZE, encodings=None):
+    """
+    Паралельна обробка одного файлу: файл ріжеться на шматки по chunk_size
+    байтів на межах токенів, шматки аналізуються в pool (ініціалізованому
+    _init_worker), а результати збираються по порядку. Вихідні файли та рядок
+    статистики такі самі, як при послідовній обробці.
+    Повертає (рядок або None, (влучання, промахи кешу), знімок ResolverMetrics).
+    """
+    metrics = ResolverMetrics()
+    cache_hits, cache_misses = 0, 0
+    file_start = time.time()
+    try:
+        # Кодування визначається для всього файлу, а не для кожного шматка
+        encoding = detect_encoding(path, encodings)
+        if byte_scanner(encoding) is not None:
+            bounds = split_file_chunks(path, chunk_size)
+        else:
+            # Межі шматків безпечні лише для кодувань, сумісних з ASCII
+            bounds = [(0, os.path.getsize(path))]
+    except UnicodeDecodeError:
+        log(f"{file_label} {SKIPPED_ENCODING}")
+        return None, (0, 0), metrics.snapshot()
+    except Exception as e:
+        log(f"{file_label} Помилка при читанні: {e}")
+        return None, (0, 0), metrics.snapshot()
+
+    log(f"{file_label} Початок обробки ({len(bounds)} шматків)")
+    accumulator = calculator.accumulator()
+    indexer = writer.index.open_text(name) if writer.index is not None else None
+    windows = writer.windows.open_text(name) if writer.windows is not None else None
+    tasks = [(path, name, start, end, encoding, indexer is not None, windows is not None)
+             for start, end in bounds]
+    try:
+        with writer.open_streams(name) as streams:
+            outcomes = pool.imap(_worker_analyze_chunk, tasks)
+            for texts, partial, (hits, misses), snapshot, index_partial, window_partial in outcomes:
+                streams.add_block(texts)
+                accumulator.merge(StatisticsAccumulator.from_dict(calculator, partial))
+                cache_hits += hits
+                cache_misses += misses
+                metrics.merge(snapshot)
+                if indexer is not None:
+                    indexer.merge(index_partial)
+                if windows is not None:
+                    words, analysis_by_word = window_partial
+                    windows.add_words(words, [analysis_by_word[w] for w in words])
+        if indexer is not None:
+            indexer.close()
+        if windows is not None:
+            windows.close()
+    except Exception as e:
+        log(f"{file_label} Помилка при обробці: {e}")
+        return None, (cache_hits, cache_misses), metrics.snapshot()
+    duration = round(time.time() - file_start, 3)
+    log(f"{file_label} Час обробки {duration} сек.")
+    return accumulator.text_row(name), (cache_hits, cache_misses), metrics.snapshot()
+
+def _no_log(message):
+    pass
+
+class OrderedRowSink:
+    """
+    Передає рядки статистики в експортер у порядку індексів файлів:
+    рядок, що прийшов раніше за попередні, чекає, доки ті не будуть готові.
+    None означає пропущений файл. many — кожне значення є списком рядків
+    (ряд вікон тексту).
+    """
+    def __init__(self, exporter, many=False):
+        self.exporter = exporter
+        self.many = many
+        self.waiting = {}
+        self.next_index = 0
+        self.count = 0
+
+    def put(self, index, row):
+        self.waiting[index] = row
+        while self.next_index in self.waiting:
+            ready = self.waiting.pop(self.next_index)
+            self.next_index += 1
+            if ready is not None:
+                for row in (ready if self.many else [ready]):
+                    self.exporter.add(row)
+                self.count += 1
+
+    def close(self):
+        self.exporter.close()
+
+def main(input_path, output_path, log_callback=None, cache_path=None,
+         memo_size=DEFAULT_MEMO_SIZE, batch_g2p=False, g2p_batch_size=256, g2p_workers=1,
+         workers=1, offline=None, lexicon_path=None, stream=False,
+         chunk_size=DEFAULT_CHUNK_SIZE, stats_backend="python", incremental=False,
+         stats_format="xlsx", resolver_mode=RESOLVER_FAST, lemma_table_path=None,
+         progress_callback=None, cancel_event=None, components=None, recursive=False,
+         include=None, exclude=None, shard=None, split_files=False, pipeline=False,
+         archive=False, encodings=None, index=False, window=None, window_stride=None):
     """
     Якщо log_callback передано, то кожен виклик log_callback(message)
     додасть message у лог GUI.
+    Якщо cache_path передано, транскрипції зберігаються у постійному кеші
+    (SQLite) і повторно використовуються між запусками.
+    memo_size — розмір LRU-кешу аналізу слів у межах запуску.
+    batch_g2p — двофазний режим: спершу всі OOV-слова корпусу проходять
+    G2P пакетами по g2p_batch_size (у g2p_workers процесах), потім аналіз.
+    workers — кількість процесів для паралельної обробки файлів;
+    рядки статистики та лог повертаються у порядку вхідних файлів.
+    offline — не звертатися до мережі за ресурсами NLTK (None — зі змінної
+    середовища PHONETIC_ANALYZER_OFFLINE).
+    lexicon_path — компільований лексикон (python lexicon.py ФАЙЛ), спільний
+    для всіх процесів через mmap, замість cmudict і даних pronouncing.
+    stream — потокова обробка файлів шматками по chunk_size символів
+    (обмежена пам'ять для дуже великих текстів).
+    stats_backend — "python" або "numpy" (векторизований підрахунок статистики).
+    incremental — пропускати файли, вміст яких не змінився з минулого запуску
+    (маніфест manifest.json у вихідній папці зберігає хеші та рядки статистики).
+    stats_format — формат таблиці статистики: "xlsx", "csv" або "parquet".
+    resolver_mode — "fast" (спершу точний пошук у CMU, лематизація лише при
+    промаху) або "compat" (попередній порядок: лематизація для кожного слова);
+    результати однакові.
+    lemma_table_path — таблиця словоформа → лема (python lemma_table.py ...).
+    progress_callback(done, total) — викликається після кожного завершеного
+    (або пропущеного) файлу.
+    cancel_event — threading.Event; якщо встановлено, обробка зупиняється
+    між файлами, а статистика записується для вже оброблених файлів.
+    components — уже завантажені компоненти (build_components), напр. з
+    daemon.py: використовуються замість нових і не закриваються наприкінці;
+    параметри cache_path, offline, lexicon_path тощо тоді визначає той, хто їх створив.
+    recursive — шукати тексти і у вкладених теках (вихідні файли повторюють
+    структуру тек); include / exclude — списки glob-шаблонів для відносного
+    шляху або імені файлу (за замовчуванням include = ["*.txt"]).
+    shard — "i/n" або (i, n): обробити лише i-ту з n неперетинних частин
+    корпусу (для кількох машин); рядки шардів об'єднує merge_statistics.
+    split_files — (при workers > 1) кожен файл ріжеться на шматки по chunk_size
+    байтів, які аналізуються паралельно; для одного дуже великого тексту.
+    Результат такий самий, як при послідовній обробці.
+    pipeline — (при workers = 1, без stream) конвеєр: наступні файли читаються
+    у фоновому потоці, а вихідні файли пишуться пулом потоків, поки триває
+    аналіз; лог і результат — як без конвеєра.
+    archive — замість п'яти файлів на текст усі вихідні тексти пишуться в
+    один індексований архів Outputs.jsonl (див. output_archive.py; звичну
+    структуру тек відтворює output_archive.ArchiveReader.export).
+    encodings — кодування вхідних файлів, що пробуються по черзі (за
+    замовчуванням utf-8, потім cp1252); файли, що не декодуються жодним, пропускаються.
+    index — будувати інвертований індекс PhoneticIndex.db (фонеми, склади,
+    CVV-шаблони та перші склади → тексти й позиції слів; запити — phonetic_index.py).
+    window — розмір ковзного вікна у словах: для кожного тексту рахується ряд
+    статистики вікон з кроком window_stride слів (за замовчуванням = window),
+    який пишеться поруч у StatisticsWindows.<stats_format>. Слова після
+    останнього повного вікна дають завершальне неповне вікно (колонка Words).
+    Після запуску у вихідній папці з'являються ResolverMetrics.json (кількість
+    слів і час кожного рівня розпізнавання, загалом і по файлах, та слова,
+    що дійшли до G2P) і UnknownWords/all_unknown.txt (якщо є невідомі слова).
     """
-    analyzer = PhoneticAnalyzer()
-    syllabifier = Syllabifier()
-    writer = OutputWriter(output_path)
-    stats_collector = StatisticsCalculator(vowels=writer.vowels)
+    log = log_callback or _no_log
+    output_archive = None
+    if archive:
+        # В інкрементальному режимі незмінені тексти лишаються в наявному архіві
+        output_archive = OutputArchive(os.path.join(output_path, ARCHIVE_NAME), append=incremental)
+    index_writer = None
+    if index:
+        index_writer = IndexWriter(os.path.join(output_path, INDEX_NAME), append=incremental)
+    writer = OutputWriter(output_path, output_archive, index_writer)
+    window_series = None
+    if window:
+        window_series = writer.windows = WindowSeries(
+            StatisticsCalculator(vowels=writer.vowels), window, window_stride
+        )
 
-    results = []
-    files_to_process = []
+    # У паралельному режимі аналізатор батьківського процесу потрібен лише для G2P-фази
+    own_components = components is None
+    if not own_components:
+        # Теплі компоненти: вихідна папка та метрики — свої для кожного запуску
+        components = components._replace(writer=writer)
+        components.analyzer.metrics = ResolverMetrics()
+    elif workers <= 1 or batch_g2p:
+        components = build_components(output_path, cache_path, memo_size, offline, lexicon_path,
+                                      stats_backend, resolver_mode, lemma_table_path)
+        components = components._replace(writer=writer)
 
+    # Пари (відносний шлях, повний шлях), відсортовані за відносним шляхом
     if os.path.isdir(input_path):
-        files_to_process = get_txt_files_in_folder(input_path)
+        found = sorted(iter_files(input_path, recursive, include, exclude))
     else:
-        files_to_process = [input_path]
+        found = [(os.path.basename(input_path), input_path)]
+    if shard is not None:
+        shard_index, shard_count = parse_shard(shard) if isinstance(shard, str) else shard
+        found = [(rel, path) for rel, path in found if in_shard(rel, shard_index, shard_count)]
+        log(f"Шард {shard_index}/{shard_count}: {len(found)} файлів")
 
+    files_to_process = [path for _, path in found]
+    names = [os.path.splitext(rel)[0] for rel, _ in found]
     total_files = len(files_to_process)
-    processed_count = 0
+    tasks = [
+        (path, f"[{idx}/{total_files}] {rel}", stream, chunk_size, names[idx - 1], encodings)
+        for idx, (rel, path) in enumerate(found, start=1)
+    ]
 
     total_start = time.time()
 
-    for idx, path in enumerate(files_to_process, start=1):
-        name = os.path.splitext(os.path.basename(path))[0]
-        file_label = f"[{idx}/{total_files}] {os.path.basename(path)}"
-        try:
-            file_start = time.time()
-            words = read_txt_file(path)
-        except UnicodeDecodeError:
-            if log_callback:
-                log_callback(f"{file_label} Пропущено (не UTF-8)")
-            continue
-        except Exception as e:
-            if log_callback:
-                log_callback(f"{file_label} Помилка при читанні: {e}")
-            continue
+    # Рядки статистики йдуть в експортер у порядку вхідних файлів, щойно готові
+    sink = OrderedRowSink(writer.open_statistics(f"Statistics.{stats_format}"))
+    window_sink = None
+    if window_series is not None:
+        window_sink = OrderedRowSink(
+            writer.open_statistics(f"StatisticsWindows.{stats_format}", totals=False), many=True
+        )
 
-        if log_callback:
-            log_callback(f"{file_label} Початок обробки")
-        try:
-            row = process_text(name, words, writer, stats_collector, analyzer, syllabifier)
-            results.append(row)
-            processed_count += 1
-            file_end = time.time()
-            duration = round(file_end - file_start, 3)
-            if log_callback:
-                log_callback(f"{file_label} Час обробки {duration} сек.")
-        except Exception as e:
-            if log_callback:
-                log_callback(f"{file_label} Помилка при обробці: {e}")
-            continue
+    # Інкрементальний режим: незмінені файли беруться з маніфесту
+    digests = {}
+    manifest = None
+    if incremental:
+        manifest = RunManifest(output_path, lexicon_version(lexicon_path))
+        pending = []
+        for i, task in enumerate(tasks):
+            path, file_label, name = task[0], task[1], task[4]
+            try:
+                digests[i] = file_digest(path)
+            except OSError:
+                pending.append(i)
+                continue
+            cached_row = manifest.lookup(path, digests[i])
+            cached_windows = None
+            if window_series is not None and cached_row is not None:
+                cached_windows = manifest.windows(path, window_series.key())
+                if cached_windows is None:
+                    # Ряд вікон з іншими параметрами (або без нього) — текст аналізується знову
+                    cached_row = None
+            if cached_row is not None and writer.outputs_exist(name):
+                sink.put(i, cached_row)
+                if window_sink is not None:
+                    window_sink.put(i, cached_windows)
+                log(f"{file_label} Без змін, пропущено")
+            else:
+                pending.append(i)
+    else:
+        pending = list(range(total_files))
+
+    progress = {"done": total_files - len(pending)}
+    # Назви текстів, чий рядок статистики записано
+    finished = set()
+
+    def report_progress():
+        if progress_callback:
+            progress_callback(progress["done"], total_files)
+
+    def finish_file(i, row):
+        if row is not None:
+            finished.add(names[i])
+        window_rows = None
+        if window_series is not None:
+            window_rows = window_series.pop(names[i])
+            if row is None:
+                window_rows = None
+            window_sink.put(i, window_rows)
+        if manifest is not None:
+            if row is not None and i in digests:
+                manifest.update(files_to_process[i], digests[i], row, window_rows,
+                                window_series.key() if window_series is not None else None)
+            else:
+                manifest.discard(files_to_process[i])
+        sink.put(i, row)
+        progress["done"] += 1
+        report_progress()
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    report_progress()
+
+    if batch_g2p and not cancelled():
+        prefetch_oov([files_to_process[i] for i in pending], components.analyzer,
+                     g2p_batch_size, g2p_workers, log_callback, encodings)
 
+    cache_hits, cache_misses = 0, 0
+    cache = components.analyzer.cache if components is not None else None
+    if cache is not None:
+        # Лічильники теплого кешу включають попередні запуски — рахуємо різницю
+        cache_hits, cache_misses = -cache.hits, -cache.misses
+    metrics = components.analyzer.metrics if components is not None else ResolverMetrics()
+    if workers > 1:
+        g2p_results = components.analyzer.g2p_results if components is not None else {}
+        initargs = (output_path, cache_path, memo_size, offline, lexicon_path, stats_backend,
+                    resolver_mode, lemma_table_path, g2p_results,
+                    # При split_files усе пише батьківський процес
+                    archive and not split_files, index and not split_files,
+                    (window_series.window, window_series.stride)
+                    if window_series is not None and not split_files else None)
+        for base_name in (ARCHIVE_NAME, INDEX_NAME):
+            for part in worker_parts(output_path, base_name, leftovers=True):
+                os.remove(part)
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            if split_files:
+                # Файли по черзі, кожен — шматками паралельно в усіх воркерах
+                calculator = StatisticsCalculator(vowels=writer.vowels)
+                for i in pending:
+                    if cancelled():
+                        break
+                    path, file_label, name = tasks[i][0], tasks[i][1], tasks[i][4]
+                    row, (hits, misses), snapshot = analyze_file_chunked(
+                        pool, path, file_label, name, writer, calculator, log, chunk_size,
+                        encodings)
+                    cache_hits += hits
+                    cache_misses += misses
+                    metrics.merge(snapshot)
+                    finish_file(i, row)
+            else:
+                outcomes = pool.imap(_worker_analyze_file, [tasks[i] for i in pending])
+                for i, outcome in zip(pending, outcomes):
+                    row, messages, (hits, misses), snapshot, window_rows = outcome
+                    for message in messages:
+                        log(message)
+                    if window_rows is not None:
+                        window_series.put(names[i], window_rows)
+                    cache_hits += hits
+                    cache_misses += misses
+                    metrics.merge(snapshot)
+                    finish_file(i, row)
+                    if cancelled():
+                        # Вихід з with завершує воркери, не чекаючи решти файлів
+                        break
+        # Частини архіву та індексу, записані воркерами, — в основні файли;
+        # лише тексти, що потрапили в статистику (після скасування воркери
+        # могли дописати ще кілька)
+        for target, base_name in ((output_archive, ARCHIVE_NAME), (index_writer, INDEX_NAME)):
+            if target is not None:
+                for part in worker_parts(output_path, base_name):
+                    target.append_from(part, finished)
+                for part in worker_parts(output_path, base_name, leftovers=True):
+                    os.remove(part)
+    elif pipeline and not stream:
+        analyze_files_pipelined([(i, tasks[i]) for i in pending], components, log, finish_file,
+                                cancelled)
+    else:
+        for i in pending:
+            if cancelled():
+                break
+            path, file_label, name = tasks[i][0], tasks[i][1], tasks[i][4]
+            finish_file(i, analyze_file(path, file_label, components, log, stream, chunk_size,
+                                        name, encodings))
+
+    if manifest is not None:
+        manifest.save()
+
+    if cache is not None:
+        cache_hits += cache.hits
+        cache_misses += cache.misses
+
+    processed_count = sink.count
+    sink.close()
+    if window_sink is not None:
+        window_sink.close()
+    if output_archive is not None:
+        output_archive.close()
+    if index_writer is not None:
+        index_writer.close()
     total_end = time.time()
     total_duration = round(total_end - total_start, 3)
-    writer.write_statistics("Statistics.xlsx", results)
-    if log_callback:
-        log_callback(f"Завершено: успішно оброблено {processed_count} з {total_files} файлів.")
-        log_callback(f"Загальний час: {total_duration} сек.")
+    if cancelled():
+        log("Обробку скасовано.")
+    log(f"Завершено: успішно оброблено {processed_count} з {total_files} файлів.")
+    log(f"Загальний час: {total_duration} сек.")
+    if cache_path or cache is not None:
+        log(f"Кеш транскрипцій: влучань {cache_hits}, промахів {cache_misses}")
+
+    metrics.write_json(os.path.join(output_path, METRICS_NAME))
+    unknown = metrics.unknown_words()
+    if unknown:
+        writer.write_unknown("all", unknown)
+    for line in metrics.summary_lines():
+        log(line)
+    if components is not None and own_components:
+        components.analyzer.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Фонетичний аналіз англійських текстів")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    analyze = commands.add_parser("analyze", help="аналіз файлу або теки")
+    analyze.add_argument("input", help="вхідний .txt файл або тека")
+    analyze.add_argument("output", help="вихідна тека")
+    analyze.add_argument("--recursive", action="store_true", help="обходити вкладені теки")
+    analyze.add_argument("--include", action="append", help="glob-шаблон файлів (можна кілька)")
+    analyze.add_argument("--exclude", action="append", help="glob-шаблон для пропуску")
+    analyze.add_argument("--shard", help="i/n — обробити лише i-ту з n частин корпусу")
+    analyze.add_argument("--workers", type=int, default=1)
+    analyze.add_argument("--cache", help="постійний кеш транскрипцій (SQLite)")
+    analyze.add_argument("--lexicon", help="компільований лексикон")
+    analyze.add_argument("--lemma-table", help="таблиця словоформа → лема")
+    analyze.add_argument("--batch-g2p", action="store_true")
+    analyze.add_argument("--stream", action="store_true")
+    analyze.add_argument("--pipeline", action="store_true",
+                         help="читання та запис паралельно з аналізом (при --workers 1)")
+    analyze.add_argument("--split-files", action="store_true",
+                         help="кожен файл — шматками паралельно (потрібно --workers > 1)")
+    analyze.add_argument("--incremental", action="store_true")
+    analyze.add_argument("--encoding", action="append", dest="encodings",
+                         help="кодування вхідних файлів у порядку спроб "
+                              "(можна кілька; за замовчуванням utf-8, cp1252)")
+    analyze.add_argument("--index", action="store_true",
+                         help="будувати фонетичний індекс PhoneticIndex.db")
+    analyze.add_argument("--archive", action="store_true",
+                         help="усі вихідні тексти — в один архів Outputs.jsonl")
+    analyze.add_argument("--window", type=int,
+                         help="ряд статистики ковзних вікон по N слів (StatisticsWindows); "
+                              "хвіст тексту — останнє неповне вікно, колонка Words")
+    analyze.add_argument("--window-stride", type=int,
+                         help="крок вікна у словах (за замовчуванням — розмір вікна)")
+    analyze.add_argument("--stats-format", choices=FORMATS, default="xlsx")
+    analyze.add_argument("--stats-backend", choices=("python", "numpy"), default="python")
+    analyze.add_argument("--offline", action="store_true")
+
+    merge = commands.add_parser("merge", help="об'єднати таблиці статистики шардів")
+    merge.add_argument("output", help="вихідна таблиця (xlsx, csv або parquet)")
+    merge.add_argument("inputs", nargs="+", help="таблиці статистики шардів")
+    return parser.parse_args(argv)
+
+def cli(argv=None):
+    args = parse_args(argv)
+    if args.command == "merge":
+        count = merge_statistics(args.inputs, args.output)
+        print(f"Об'єднано {count} рядків у {args.output}")
+        return
+    main(args.input, args.output, log_callback=print, cache_path=args.cache,
+         batch_g2p=args.batch_g2p, workers=args.workers, offline=args.offline or None,
+         lexicon_path=args.lexicon, stream=args.stream, stats_backend=args.stats_backend,
+         incremental=args.incremental, stats_format=args.stats_format,
+         lemma_table_path=args.lemma_table, recursive=args.recursive,
+         include=args.include, exclude=args.exclude, shard=args.shard,
+         split_files=args.split_files, pipeline=args.pipeline, archive=args.archive,
+         encodings=args.encodings, index=args.index, window=args.window,
+         window_stride=args.window_stride)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    cli()
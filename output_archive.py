@@ -0,0 +1,255 @@
+"""
+Зведений архів вихідних файлів: замість п'яти файлів на кожен текст —
+один JSONL-файл (Outputs.jsonl), по рядку на текст:
+  {"name": назва, "Transcribed": ..., "Syllables": ..., "SyllablesCVV": ...,
+   "FirstSyllables": ..., "FirstSyllablesCVV": ...}
+Файл лише доповнюється; індекс (Outputs.jsonl.idx: назва, зсув, довжина)
+дає доступ до будь-якого тексту без читання всього архіву. Якщо текст
+додано кілька разів, діє останній запис.
+
+Відновлення звичної структури тек:
+  python output_archive.py АРХІВ ВИХІДНА_ПАПКА [НАЗВА ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+
+from output_writer import OutputWriter, TextOutputStreams, format_word
+
+ARCHIVE_NAME = "Outputs.jsonl"
+INDEX_SUFFIX = ".idx"
+# Частини архіву та індексу від процесів-воркерів (<назва>.part-<pid>),
+# які main зливає в основні файли
+PART_SUFFIX = ".part-"
+
+_NAME_PREFIX = '{"name": '
+_DECODER = json.JSONDecoder()
+
+
+def _escape(text):
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+def record_name(line):
+    """
+    Назва тексту з рядка архіву (декодується лише поле name).
+    """
+    return _DECODER.raw_decode(line, len(_NAME_PREFIX))[0]
+
+
+def scan_index(path):
+    """
+    Індекс назва → (зсув, довжина) за повним переглядом архіву.
+    """
+    index = {}
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            index[record_name(line.decode("utf-8"))] = (offset, len(line))
+            offset += len(line)
+    return index
+
+
+def load_index(path):
+    """
+    Індекс архіву path; якщо файлу індексу немає або він не покриває
+    весь архів (напр., запуск перервано), індекс будується заново.
+    """
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    try:
+        with open(path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+            header = f.readline().rstrip("\n").split("\t")
+            if header[0] != "#size" or int(header[1]) != size:
+                raise ValueError("застарілий індекс")
+            index = {}
+            for line in f:
+                name, offset, length = line.rstrip("\n").rsplit("\t", 2)
+                index[name] = (int(offset), int(length))
+            return index
+    except (OSError, ValueError, IndexError):
+        return scan_index(path) if size else {}
+
+
+class OutputArchive:
+    """
+    Запис архіву. Безпечний для кількох потоків (пул запису конвеєра).
+    append — дописувати до наявного архіву (інкрементальний режим),
+    інакше архів створюється заново.
+    """
+    def __init__(self, path, append=False, folders=TextOutputStreams.FOLDERS):
+        self.path = path
+        self.folders = list(folders)
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.index = load_index(path) if append else {}
+        self._file = open(path, "ab" if append else "wb")
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def _append(self, name, data):
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(data)
+            # Запис одразу потрапляє у файл: частини воркерів читає батьківський процес
+            self._file.flush()
+            self.index[name] = (offset, len(data))
+
+    def add(self, name, texts):
+        record = {"name": name}
+        record.update(zip(self.folders, texts))
+        self._append(name, (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def open_streams(self, name):
+        return ArchiveStreams(self, name)
+
+    def add_spooled(self, name, spools):
+        """
+        Запис з тимчасових файлів, що вже містять JSON-екрановані тексти
+        (ArchiveStreams), без збирання всього тексту в пам'яті.
+        """
+        with tempfile.TemporaryFile() as record:
+            record.write((_NAME_PREFIX + json.dumps(name, ensure_ascii=False)).encode("utf-8"))
+            for folder, spool in zip(self.folders, spools):
+                record.write(f', "{folder}": "'.encode("utf-8"))
+                spool.seek(0)
+                for chunk in iter(lambda: spool.read(1 << 20), ""):
+                    record.write(chunk.encode("utf-8"))
+                record.write(b'"')
+            record.write(b"}\n")
+            with self._lock:
+                offset = self._file.tell()
+                record.seek(0)
+                for chunk in iter(lambda: record.read(1 << 20), b""):
+                    self._file.write(chunk)
+                self._file.flush()
+                self.index[name] = (offset, self._file.tell() - offset)
+
+    def append_from(self, part_path, names=None):
+        """
+        Дописує всі записи іншого архіву (частини воркера) в цей;
+        якщо задано names — лише тексти з цими назвами.
+        """
+        with open(part_path, "rb") as part, self._lock:
+            for line in part:
+                if not line.endswith(b"\n"):
+                    # Обірваний останній запис (воркер зупинено посеред запису)
+                    break
+                name = record_name(line.decode("utf-8"))
+                if names is not None and name not in names:
+                    continue
+                offset = self._file.tell()
+                self._file.write(line)
+                self.index[name] = (offset, len(line))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            size = self._file.tell()
+            self._file.close()
+            tmp_path = self.path + INDEX_SUFFIX + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(f"#size\t{size}\n")
+                for name, (offset, length) in self.index.items():
+                    f.write(f"{name}\t{offset}\t{length}\n")
+            os.replace(tmp_path, self.path + INDEX_SUFFIX)
+
+
+class ArchiveStreams:
+    """
+    Потоковий запис одного тексту в архів — той самий інтерфейс, що й
+    output_writer.TextOutputStreams (add, add_block), але тексти
+    накопичуються у тимчасових файлах і потрапляють в архів при close().
+    Якщо блок with завершився винятком, недописаний текст відкидається,
+    а архів лишається без змін.
+    """
+    def __init__(self, archive, name):
+        self.archive = archive
+        self.name = name
+        self.files = [tempfile.TemporaryFile("w+", encoding="utf-8") for _ in archive.folders]
+        self.first = True
+
+    def add(self, phonemes, syllables, cvv):
+        self.add_block(format_word(phonemes, syllables, cvv))
+
+    def add_block(self, texts):
+        if texts is None:
+            return
+        separator = "" if self.first else " "
+        self.first = False
+        for f, text in zip(self.files, texts):
+            f.write(_escape(separator + text))
+
+    def close(self):
+        try:
+            self.archive.add_spooled(self.name, self.files)
+        finally:
+            self.discard()
+
+    def discard(self):
+        for f in self.files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class ArchiveReader:
+    """
+    Довільний доступ до текстів архіву за назвою.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.index = load_index(path)
+
+    def names(self):
+        return list(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, name):
+        """
+        Словник тека → вміст вихідного файлу тексту name.
+        """
+        offset, length = self.index[name]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            record = json.loads(f.read(length).decode("utf-8"))
+        del record["name"]
+        return record
+
+    def export(self, output_folder, names=None):
+        """
+        Відтворює звичну структуру тек (Transcribed/назва.txt тощо)
+        для всіх текстів або лише для names. Повертає кількість текстів.
+        """
+        writer = OutputWriter(output_folder)
+        names = self.names() if names is None else names
+        for name in names:
+            for folder, text in self.get(name).items():
+                with open(writer.output_path(folder, name), "w", encoding="utf-8") as f:
+                    f.write(text)
+        return len(names)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Використання: python output_archive.py АРХІВ ВИХІДНА_ПАПКА [НАЗВА ...]")
+        sys.exit(1)
+    reader = ArchiveReader(sys.argv[1])
+    count = reader.export(sys.argv[2], sys.argv[3:] or None)
+    print(f"Відтворено {count} текстів у {sys.argv[2]}")
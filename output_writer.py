@@ -1,23 +1,34 @@
 import os
-from openpyxl import Workbook, load_workbook
+from statistics_export import StatisticsExporter
 
 class OutputWriter:
-    def __init__(self, output_folder):
+    def __init__(self, output_folder, archive=None, index=None, windows=None):
+        """
+        archive — необов'язковий output_archive.OutputArchive: тоді п'ять
+        вихідних файлів кожного тексту пишуться одним записом в архів.
+        index — необов'язковий phonetic_index.IndexWriter, куди додається
+        кожен проаналізований текст.
+        windows — необов'язковий statistics_calculator.WindowSeries: ряди
+        статистики ковзних вікон кожного тексту.
+        """
         self.output_folder = output_folder
+        self.archive = archive
+        self.index = index
+        self.windows = windows
+        # Папки, вже створені за цей запуск (makedirs — один раз на папку)
+        self._ready_dirs = set()
         self.vowels = {
             "AA", "AE", "AH", "AO", "AW", "AY", "EH", "ER",
             "EY", "IH", "IY", "OW", "OY", "UH", "UW"
         }
 
     def write_transcription(self, name, data):
-        path = os.path.join(self.output_folder, "Transcribed", f"{name}.txt")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        path = self.output_path("Transcribed", name)
         with open(path, "w", encoding="utf-8") as f:
             f.write(" ".join(" ".join(phonemes) for _, phonemes in data))
 
     def write_syllables(self, name, data):
-        path = os.path.join(self.output_folder, "Syllables", f"{name}.txt")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        path = self.output_path("Syllables", name)
         with open(path, "w", encoding="utf-8") as f:
             result = []
             for _, syllables in data:
@@ -25,20 +36,25 @@ class OutputWriter:
                 result.append(syll_str)
             f.write(" ".join(result))
 
-    def write_syllables_cvv(self, name, data):
-        path = os.path.join(self.output_folder, "SyllablesCVV", f"{name}.txt")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+    def write_syllables_cvv(self, name, data, patterns=None):
+        """
+        patterns — необов'язкові готові CVV-шаблони складів для кожного слова
+        (у тому ж порядку, що й data); якщо не передано, обчислюються тут.
+        """
+        path = self.output_path("SyllablesCVV", name)
         with open(path, "w", encoding="utf-8") as f:
-            output_line = " ".join(
-                "/".join("".join("V" if p.rstrip("012") in self.vowels else "C" for p in syll)
-                         for syll in syllables)
-                for _, syllables in data
-            )
+            if patterns is not None:
+                output_line = " ".join("/".join(word_patterns) for word_patterns in patterns)
+            else:
+                output_line = " ".join(
+                    "/".join("".join("V" if p.rstrip("012") in self.vowels else "C" for p in syll)
+                             for syll in syllables)
+                    for _, syllables in data
+                )
             f.write(output_line)
 
     def write_first_syllables(self, name, data):
-        path = os.path.join(self.output_folder, "FirstSyllables", f"{name}.txt")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        path = self.output_path("FirstSyllables", name)
         with open(path, "w", encoding="utf-8") as f:
             output_line = " ".join(
                 "-".join(syllables[0]) if syllables else ""
@@ -46,96 +62,75 @@ class OutputWriter:
             )
             f.write(output_line)
 
-    def write_first_syllables_cvv(self, name, data):
-        path = os.path.join(self.output_folder, "FirstSyllablesCVV", f"{name}.txt")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+    def write_first_syllables_cvv(self, name, data, patterns=None):
+        path = self.output_path("FirstSyllablesCVV", name)
         with open(path, "w", encoding="utf-8") as f:
-            output_line = " ".join(
-                "".join("V" if p.rstrip("012") in self.vowels else "C" for p in syllables[0])
-                if syllables else ""
-                for _, syllables in data
-            )
+            if patterns is not None:
+                output_line = " ".join(
+                    word_patterns[0] if word_patterns else ""
+                    for word_patterns in patterns
+                )
+            else:
+                output_line = " ".join(
+                    "".join("V" if p.rstrip("012") in self.vowels else "C" for p in syllables[0])
+                    if syllables else ""
+                    for _, syllables in data
+                )
             f.write(output_line)
 
+    def output_path(self, folder, name):
+        # name може містити підтеки ("a/b") — вони відтворюються у folder
+        path = os.path.join(self.output_folder, folder, f"{name}.txt")
+        directory = os.path.dirname(path)
+        if directory not in self._ready_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._ready_dirs.add(directory)
+        return path
+
+    def write_text_outputs(self, name, analyses):
+        """
+        Усі п'ять вихідних файлів тексту за один прохід по словах.
+        analyses — послідовність WordAnalysis (фонеми, склади, CVV-шаблони).
+        Вміст байт-у-байт збігається з окремими методами write_*.
+        """
+        texts = format_block(analyses) or ("",) * len(TextOutputStreams.FOLDERS)
+        if self.archive is not None:
+            self.archive.add(name, texts)
+            return
+        for folder, text in zip(TextOutputStreams.FOLDERS, texts):
+            with open(self.output_path(folder, name), "w", encoding="utf-8") as f:
+                f.write(text)
+
+    def outputs_exist(self, name):
+        if self.index is not None and name not in self.index:
+            return False
+        if self.archive is not None:
+            return name in self.archive
+        return all(
+            os.path.exists(os.path.join(self.output_folder, folder, f"{name}.txt"))
+            for folder in TextOutputStreams.FOLDERS
+        )
+
+    def open_streams(self, name):
+        """
+        Потоковий запис п'яти вихідних файлів тексту слово за словом.
+        """
+        if self.archive is not None:
+            return self.archive.open_streams(name)
+        return TextOutputStreams(self, name)
+
+    def open_statistics(self, name, fmt=None, totals=True):
+        """
+        Потоковий експортер таблиці статистики (xlsx/csv/parquet за розширенням name).
+        """
+        return StatisticsExporter(os.path.join(self.output_folder, name), fmt, totals)
+
     def write_statistics(self, name, data):
-        path = os.path.join(self.output_folder, "Statistics.xlsx")
         if not data:
             return
-
-        # Ключі, які фіксуємо спочатку
-        fixed_keys = ["Text", "Length", "PhonemeCount", "SyllablesCount", "AverageSyllables"]
-
-        # Беремо перший рядок, щоб зберегти порядок додаткових ключів
-        first_row = data[0]
-        additional_keys = [k for k in first_row.keys() if k not in set(fixed_keys)]
-        fieldnames = fixed_keys + additional_keys
-
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-
-        # Якщо файл існує, очищуємо його перед перезаписом
-        if os.path.exists(path):
-            wb = load_workbook(path)
-            ws = wb.active
-            # Видаляємо всі рядки, крім заголовка
-            ws.delete_rows(2, ws.max_row)
-        else:
-            wb = Workbook()
-            ws = wb.active
-            ws.append(fieldnames)
-
-        # Додаємо всі рядки даних
-        for row in data:
-            ws.append([row.get(fn, "") for fn in fieldnames])
-
-        # Обчислюємо підсумки
-        sum_length = sum(row.get("Length", 0) for row in data)
-        sum_phoneme = sum(row.get("PhonemeCount", 0) for row in data)
-        sum_syllables = sum(row.get("SyllablesCount", 0) for row in data)
-        sum_c = sum(row.get("Total C", 0) for row in data)
-        sum_v = sum(row.get("Total V", 0) for row in data)
-
-        # Знаходимо індекси відповідних колонок у fieldnames
-        idx_text = fieldnames.index("Text")
-        idx_length = fieldnames.index("Length")
-        idx_phoneme = fieldnames.index("PhonemeCount")
-        idx_syllables = fieldnames.index("SyllablesCount")
-        idx_c = fieldnames.index("Total C")
-        idx_v = fieldnames.index("Total V")
-
-        # Додаємо порожній рядок перед підсумками
-        ws.append([""] * len(fieldnames))
-
-        # Рядок: загальна довжина файлів
-        row_length = [""] * len(fieldnames)
-        row_length[idx_text] = "Total Length"
-        row_length[idx_length] = sum_length
-        ws.append(row_length)
-
-        # Рядок: загальна кількість фонем
-        row_phoneme = [""] * len(fieldnames)
-        row_phoneme[idx_text] = "Total Phonemes"
-        row_phoneme[idx_phoneme] = sum_phoneme
-        ws.append(row_phoneme)
-
-        # Рядок: загальна кількість складів
-        row_syllables = [""] * len(fieldnames)
-        row_syllables[idx_text] = "Total Syllables"
-        row_syllables[idx_syllables] = sum_syllables
-        ws.append(row_syllables)
-
-        # Рядок: сумарна кількість приголосних (C)
-        row_c = [""] * len(fieldnames)
-        row_c[idx_text] = "Total C"
-        row_c[idx_c] = sum_c
-        ws.append(row_c)
-
-        # Рядок: сумарна кількість голосних (V)
-        row_v = [""] * len(fieldnames)
-        row_v[idx_text] = "Total V"
-        row_v[idx_v] = sum_v
-        ws.append(row_v)
-
-        wb.save(path)
+        with self.open_statistics(name) as exporter:
+            for row in data:
+                exporter.add(row)
 
     def write_unknown(self, name, unknown_list):
         path = os.path.join(self.output_folder, "UnknownWords", f"{name}_unknown.txt")
@@ -143,3 +138,76 @@ class OutputWriter:
         with open(path, "w", encoding="utf-8") as f:
             for w in unknown_list:
                 f.write(w + "\n")
+
+
+def format_word(phonemes, syllables, cvv):
+    """
+    Представлення одного слова в кожному з п'яти вихідних файлів.
+    """
+    return (
+        " ".join(phonemes),
+        "/".join("-".join(s) for s in syllables),
+        "/".join(cvv),
+        "-".join(syllables[0]) if syllables else "",
+        cvv[0] if cvv else "",
+    )
+
+
+def format_block(analyses):
+    """
+    П'ять рядків вихідних файлів для послідовності слів
+    (None, якщо слів немає) — див. TextOutputStreams.add_block.
+    """
+    if not analyses:
+        return None
+    parts = ([], [], [], [], [])
+    appends = [p.append for p in parts]
+    for analysis in analyses:
+        for append, piece in zip(appends, format_word(analysis.phonemes, analysis.syllables,
+                                                      analysis.cvv)):
+            append(piece)
+    return tuple(" ".join(pieces) for pieces in parts)
+
+
+class TextOutputStreams:
+    """
+    П'ять відкритих вихідних файлів одного тексту (Transcribed, Syllables,
+    SyllablesCVV, FirstSyllables, FirstSyllablesCVV). Вміст збігається з
+    відповідними методами OutputWriter, але пишеться інкрементально.
+    """
+    FOLDERS = ["Transcribed", "Syllables", "SyllablesCVV", "FirstSyllables", "FirstSyllablesCVV"]
+
+    def __init__(self, writer, name, buffer_size=1 << 16):
+        self.files = [
+            open(writer.output_path(folder, name), "w", encoding="utf-8", buffering=buffer_size)
+            for folder in self.FOLDERS
+        ]
+        self.first = True
+
+    def add(self, phonemes, syllables, cvv):
+        separator = "" if self.first else " "
+        self.first = False
+        for f, piece in zip(self.files, format_word(phonemes, syllables, cvv)):
+            f.write(separator + piece)
+
+    def add_block(self, texts):
+        """
+        Кілька слів одразу: texts — п'ять рядків, у кожному слова вже
+        з'єднані пробілами (як у write_text_outputs). Порожній блок не додається.
+        """
+        if texts is None:
+            return
+        separator = "" if self.first else " "
+        self.first = False
+        for f, text in zip(self.files, texts):
+            f.write(separator + text)
+
+    def close(self):
+        for f in self.files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,50 @@
+VOWEL_BASES = [
+    "AA", "AE", "AH", "AO", "AW", "AY", "EH", "ER",
+    "EY", "IH", "IY", "OW", "OY", "UH", "UW"
+]
+CONSONANTS = [
+    "B", "CH", "D", "DH", "F", "G", "HH", "JH", "K", "L", "M", "N",
+    "NG", "P", "R", "S", "SH", "T", "TH", "V", "W", "Y", "Z", "ZH"
+]
+
+# Канонічний інвентар ARPAbet: голосні з усіма ступенями наголосу + приголосні.
+# Порядок фіксований, тож ID однакові в усіх процесах і файлах.
+PHONEME_SYMBOLS = (
+    [base + stress for base in VOWEL_BASES for stress in "012"] + CONSONANTS
+)
+
+
+class PhonemeTable:
+    """
+    Інтернування фонем у цілі ID. Починається з канонічного інвентаря;
+    невідомі символи (наприклад, 'UNK' або сирий вивід G2P) отримують нові ID.
+    """
+    def __init__(self, symbols=PHONEME_SYMBOLS):
+        self.symbols = []
+        self.ids = {}
+        for sym in symbols:
+            self.intern(sym)
+
+    def intern(self, symbol):
+        pid = self.ids.get(symbol)
+        if pid is None:
+            pid = len(self.symbols)
+            self.ids[symbol] = pid
+            self.symbols.append(symbol)
+            self._on_new_symbol(symbol)
+        return pid
+
+    def _on_new_symbol(self, symbol):
+        # Точка розширення для таблиць, що тримають паралельні масиви ознак
+        pass
+
+    def encode(self, phonemes):
+        ids = self.ids
+        return [ids[p] if p in ids else self.intern(p) for p in phonemes]
+
+    def decode(self, ids):
+        symbols = self.symbols
+        return [symbols[i] for i in ids]
+
+    def __len__(self):
+        return len(self.symbols)
@@ -1,14 +1,76 @@
+import os
 import re
+import time
 import nltk
-import pronouncing
-from nltk.stem import WordNetLemmatizer
-from g2p_en import G2p
 
-# Ensure required NLTK resources
-nltk.download('cmudict', quiet=True)
-nltk.download('averaged_perceptron_tagger', quiet=True)
-nltk.download('wordnet', quiet=True)
-nltk.download('omw-1.4', quiet=True)
+from resolver_metrics import ResolverMetrics
+
+# Ресурси NLTK, потрібні кожному рівню: (шлях у nltk.data, назва пакета для download)
+CMU_RESOURCES = [('corpora/cmudict', 'cmudict')]
+WORDNET_RESOURCES = [('corpora/wordnet', 'wordnet'), ('corpora/omw-1.4', 'omw-1.4')]
+
+# Офлайн-режим за замовчуванням (для хостів без мережі)
+OFFLINE_ENV = "PHONETIC_ANALYZER_OFFLINE"
+
+
+def ensure_nltk_resources(resources, offline=False):
+    """
+    Перевіряє наявність ресурсів NLTK. В офлайн-режимі мережа не
+    використовується: за відсутності ресурсу одразу піднімається LookupError.
+    """
+    missing = []
+    for path, package in resources:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append((path, package))
+    if not missing:
+        return
+    if offline:
+        names = ", ".join(package for _, package in missing)
+        raise LookupError(
+            f"Відсутні ресурси NLTK ({names}); офлайн-режим не завантажує їх. "
+            f"Встановіть їх у nltk.data.path заздалегідь."
+        )
+    for _, package in missing:
+        nltk.download(package, quiet=True)
+
+
+def g2p_resources():
+    """
+    Ресурси NLTK для G2P: словник CMU (G2p.__init__) і тегер частин мови
+    (nltk.pos_tag) — той, який справді завантажує встановлена nltk:
+    з 3.9 це JSON-модель averaged_perceptron_tagger_eng, раніше — pickle
+    averaged_perceptron_tagger.
+    """
+    from nltk.tag.perceptron import PerceptronTagger
+    if hasattr(PerceptronTagger, "load_from_json"):
+        tagger = ('taggers/averaged_perceptron_tagger_eng/', 'averaged_perceptron_tagger_eng')
+    else:
+        tagger = ('taggers/averaged_perceptron_tagger/averaged_perceptron_tagger.pickle',
+                  'averaged_perceptron_tagger')
+    return [tagger] + CMU_RESOURCES
+
+
+def _no_download(*args, **kwargs):
+    return False
+
+
+def load_g2p(offline=False):
+    """
+    Створює g2p_en.G2p. Під час імпорту g2p_en сам викликає nltk.download
+    для ресурсів, яких не знайшов (зокрема застарілого тегера); в офлайн-режимі
+    потрібні ресурси вже перевірено, тож ці звернення до мережі вимикаються.
+    """
+    ensure_nltk_resources(g2p_resources(), offline=offline)
+    download = nltk.download
+    if offline:
+        nltk.download = _no_download
+    try:
+        from g2p_en import G2p
+    finally:
+        nltk.download = download
+    return G2p()
 
 # Фолбек-мапа: назви букв → фонеми (ARPAbet із цифрою стресу)
 LETTER_NAME_MAP = {
@@ -21,14 +83,170 @@ LETTER_NAME_MAP = {
     'x': ['EH1','K','S'], 'y': ['W','AY1'], 'z': ['Z','IY1']
 }
 
+# Рівні (tiers), на яких слово отримало транскрипцію
+TIER_CMU = "cmu"
+TIER_LEMMA = "lemma"
+TIER_PRONOUNCING = "pronouncing"
+TIER_CONTRACTION = "contraction"
+TIER_G2P = "g2p"
+TIER_LETTERS = "letters"
+TIER_UNKNOWN = "unknown"
+# Пакетний прохід G2P (prefetch_g2p): кількість слів і час усієї фази
+TIER_G2P_BATCH = "g2p_batch"
+# Не рівень розпізнавання, а позначка в метриках: відповідь з постійного кешу
+TIER_CACHE = "cache"
+
+# Порядок рівнів 1–2: "fast" — спершу точний пошук словоформи в CMU,
+# лематизація лише при промаху; "compat" — як раніше, лематизація завжди.
+# Результати обох режимів однакові (словоформа в CMU завжди мала пріоритет).
+RESOLVER_FAST = "fast"
+RESOLVER_COMPAT = "compat"
+RESOLVER_MODES = (RESOLVER_FAST, RESOLVER_COMPAT)
+
+# Версія логіки розпізнавання; змінюйте при зміні порядку/семантики рівнів
+RESOLVER_VERSION = "1"
+
+
+def _package_version(name):
+    try:
+        from importlib.metadata import version
+    except ImportError:
+        try:
+            import pkg_resources
+            return pkg_resources.get_distribution(name).version
+        except Exception:
+            return "unknown"
+    try:
+        return version(name)
+    except Exception:
+        return "unknown"
+
+
+def _resource_fingerprint(resource):
+    """
+    Розмір і час зміни файлу ресурсу NLTK (наприклад, corpora/cmudict).
+    """
+    try:
+        pointer = nltk.data.find(resource)
+    except LookupError:
+        return "missing"
+    path = getattr(pointer, "path", None)
+    if path is None:
+        zf = getattr(pointer, "zipfile", None)
+        path = getattr(zf, "filename", None)
+    if not path or not os.path.exists(path):
+        return "unknown"
+    st = os.stat(path)
+    return f"{st.st_size}:{int(st.st_mtime)}"
+
+
+def lexicon_version(lexicon_path=None):
+    """
+    Версія логіки розпізнавання, лексикону та G2P (без створення аналізатора).
+    """
+    if lexicon_path:
+        st = os.stat(lexicon_path)
+        lexicon = f"compiled={st.st_size}:{int(st.st_mtime)}"
+    else:
+        lexicon = f"cmudict={_resource_fingerprint('corpora/cmudict')}"
+    return "|".join([
+        f"resolver={RESOLVER_VERSION}",
+        f"nltk={_package_version('nltk')}",
+        lexicon,
+        f"wordnet={_resource_fingerprint('corpora/wordnet')}",
+        f"pronouncing={_package_version('pronouncing')}",
+        f"g2p_en={_package_version('g2p_en')}",
+    ])
+
+
 class PhoneticAnalyzer:
-    def __init__(self):
-        self.cmu = nltk.corpus.cmudict.dict()
-        self.pronouncing = pronouncing
-        self.g2p = G2p()
-        self.lemmatizer = WordNetLemmatizer()
+    def __init__(self, cache_path=None, offline=None, lexicon_path=None,
+                 resolver_mode=RESOLVER_FAST, lemma_table_path=None):
+        if resolver_mode not in RESOLVER_MODES:
+            raise ValueError(f"Невідомий режим розпізнавання: {resolver_mode}")
+        self.resolver_mode = resolver_mode
+        if offline is None:
+            offline = os.environ.get(OFFLINE_ENV, "") not in ("", "0")
+        self.offline = offline
+        # Компільований лексикон (lexicon.py) замінює і cmudict, і дані pronouncing
+        cmu_resources = [] if lexicon_path else CMU_RESOURCES
+        if offline:
+            # Швидка відмова ще до початку роботи, без звернення до мережі
+            ensure_nltk_resources(cmu_resources + WORDNET_RESOURCES + g2p_resources(),
+                                  offline=True)
+        else:
+            ensure_nltk_resources(cmu_resources)
+        self.lexicon = None
+        if lexicon_path:
+            from lexicon import CompiledLexicon
+            self.lexicon = CompiledLexicon(lexicon_path)
+            self.cmu = self.lexicon
+        else:
+            self.cmu = nltk.corpus.cmudict.dict()
+        # Важкі компоненти завантажуються ліниво, коли слово дійде до їхнього рівня
+        self._pronouncing = None
+        self._g2p = None
+        self._lemmatizer = None
         self.phoneme_pattern = re.compile(r'^[A-Z]+[0-2]?$')
+        # Словоформа → лема: попередньо обчислена таблиця (lemma_table.py),
+        # доповнюється результатами лематизатора під час роботи
+        self.lemma_table = {}
+        if lemma_table_path:
+            from lemma_table import load_lemma_table
+            self.lemma_table = load_lemma_table(lemma_table_path)
         self.unknown = set()
+        # Попередньо обчислені (пакетно) результати G2P: слово → сирі фонеми
+        self.g2p_results = {}
+        # Лічильники та затримка кожного рівня (див. resolver_metrics.py)
+        self.metrics = ResolverMetrics()
+        self._depth = 0
+        self.cache = None
+        if cache_path:
+            from pronunciation_cache import PronunciationCache
+            self.cache = PronunciationCache(cache_path, self.lexicon_version())
+
+    @property
+    def pronouncing(self):
+        if self._pronouncing is None:
+            import pronouncing
+            self._pronouncing = pronouncing
+        return self._pronouncing
+
+    @property
+    def lemmatizer(self):
+        if self._lemmatizer is None:
+            ensure_nltk_resources(WORDNET_RESOURCES, offline=self.offline)
+            from nltk.stem import WordNetLemmatizer
+            self._lemmatizer = WordNetLemmatizer()
+        return self._lemmatizer
+
+    @property
+    def g2p(self):
+        if self._g2p is None:
+            self._g2p = load_g2p(self.offline)
+        return self._g2p
+
+    def loaded_components(self):
+        """
+        Які ліниві компоненти вже завантажено (для діагностики старту).
+        """
+        return {
+            "pronouncing": self._pronouncing is not None,
+            "wordnet": self._lemmatizer is not None,
+            "g2p": self._g2p is not None,
+        }
+
+    def lexicon_version(self):
+        """
+        Рядок версії лексикону та G2P; використовується для інвалідації кешу.
+        """
+        return lexicon_version(self.lexicon.path if self.lexicon is not None else None)
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+        if self.lexicon is not None:
+            self.lexicon.close()
 
     def normalize(self, word):
         return word.lower().replace("’", "'").strip()
@@ -50,22 +268,88 @@ class PhoneticAnalyzer:
         return None
 
     def get_phonetic(self, word):
+        return self.resolve(word)[0]
+
+    def resolve(self, word):
+        """
+        Повертає (фонеми, рівень). Спершу перевіряє постійний кеш.
+        Кожен зовнішній виклик фіксується в self.metrics; частини скорочень
+        рахуються разом зі скороченням (рівень contraction).
+        """
+        start = time.perf_counter()
         key = self.normalize(word)
+        self._depth += 1
+        try:
+            phones, tier, cached = self._resolve_cached(key)
+        finally:
+            self._depth -= 1
+        if self._depth == 0:
+            elapsed = time.perf_counter() - start
+            if cached:
+                self.metrics.record(TIER_CACHE, elapsed)
+                self.metrics.note_word(tier, key)
+            else:
+                self.metrics.record(tier, elapsed)
+        return phones, tier
+
+    def _resolve_cached(self, key):
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                phones, tier = cached
+                if tier == TIER_UNKNOWN:
+                    self.unknown.add(key)
+                return phones, tier, True
+
+        phones, tier = self._resolve_tiers(key)
+        if self.cache is not None:
+            self.cache.put(key, phones, tier)
+        return phones, tier, False
+
+    def _lookup_lexicon(self, key):
+        """
+        Рівні 1–3 (лематизація, CMU, pronouncing). Повертає None, якщо слова немає.
+        """
+        # Найдешевше — точний пошук словоформи; він і так мав пріоритет над лемою
+        if self.resolver_mode == RESOLVER_FAST and key in self.cmu:
+            return self.cmu[key][0], TIER_CMU
+
         # 1) Лематизація
-        lemma_v = self.lemmatizer.lemmatize(key, pos='v')
-        lemma = self.lemmatizer.lemmatize(lemma_v, pos='n')
+        lemma = self.lemma(key)
         forms = [key] + ([lemma] if lemma != key else [])
 
         # 2) CMU lookup
         for form in forms:
             if form in self.cmu:
-                return self.cmu[form][0]
+                return self.cmu[form][0], (TIER_CMU if form == key else TIER_LEMMA)
 
         # 3) Pronouncing library
         for form in forms:
-            phones_list = self.pronouncing.phones_for_word(form)
-            if phones_list:
-                return phones_list[0].split()
+            phones = self._pronouncing_lookup(form)
+            if phones:
+                return phones, TIER_PRONOUNCING
+
+        return None
+
+    def lemma(self, key):
+        lemma = self.lemma_table.get(key)
+        if lemma is None:
+            lemma_v = self.lemmatizer.lemmatize(key, pos='v')
+            lemma = self.lemmatizer.lemmatize(lemma_v, pos='n')
+            self.lemma_table[key] = lemma
+        return lemma
+
+    def _pronouncing_lookup(self, form):
+        if self.lexicon is not None:
+            prons = self.lexicon.pronouncing_phones(form)
+            return prons[0] if prons else None
+        phones_list = self.pronouncing.phones_for_word(form)
+        return phones_list[0].split() if phones_list else None
+
+    def _resolve_tiers(self, key):
+        found = self._lookup_lexicon(key)
+        if found is not None:
+            return found
 
         # 4) Contraction handling
         parts = self.split_contraction(key)
@@ -78,19 +362,15 @@ class PhoneticAnalyzer:
                     ph = self.get_phonetic(part)
                     if ph != ['UNK']:
                         phones.extend(ph)
-            return phones or ['UNK']
+            return (phones or ['UNK']), TIER_CONTRACTION
 
         # 5) G2P fallback
-        raw = []
-        try:
-            raw = self.g2p(key)
-        except Exception:
-            pass
+        raw = self._run_g2p(key)
         valid = [p for p in raw if self.phoneme_pattern.match(p)]
         if valid:
-            return valid
+            return valid, TIER_G2P
         if raw:
-            return raw
+            return raw, TIER_G2P
 
         # 6) Letter-to-phoneme fallback
         phones = []
@@ -98,14 +378,177 @@ class PhoneticAnalyzer:
             if ch in LETTER_NAME_MAP:
                 phones.extend(LETTER_NAME_MAP[ch])
         if phones:
-            return phones
+            return phones, TIER_LETTERS
 
         # 7) Mark unknown
         self.unknown.add(key)
-        return ['UNK']
+        self.metrics.note_word(TIER_UNKNOWN, key)
+        return ['UNK'], TIER_UNKNOWN
+
+    def _run_g2p(self, key):
+        self.metrics.note_word(TIER_G2P, key)
+        if key in self.g2p_results:
+            return self.g2p_results[key]
+        try:
+            return self.g2p(key)
+        except LookupError:
+            # Офлайн: бракує ресурсу — помилка, а не тихий фолбек на літери,
+            # який потрапив би в постійний кеш
+            if self.offline:
+                raise
+            return []
+        except Exception:
+            return []
+
+    def g2p_candidates(self, words):
+        """
+        Множина нормалізованих слів, які дійдуть до рівня G2P
+        (немає у кеші, словниках, і це не розкладне скорочення).
+        """
+        candidates = set()
+        seen = set()
+        for word in words:
+            self._collect_g2p(self.normalize(word), candidates, seen)
+        return candidates
+
+    def _collect_g2p(self, key, candidates, seen):
+        if key in seen:
+            return
+        seen.add(key)
+        if self.cache is not None and key in self.cache:
+            return
+        if self._lookup_lexicon(key) is not None:
+            return
+        parts = self.split_contraction(key)
+        if parts:
+            for part in parts:
+                if part != "possessive":
+                    self._collect_g2p(part, candidates, seen)
+            return
+        candidates.add(key)
+
+    def prefetch_g2p(self, words, batch_size=256, workers=1):
+        """
+        Двофазний режим G2P: збирає всі OOV-слова, запускає G2P один раз
+        для дедуплікованої множини пакетами по batch_size слів — кожен пакет
+        проходить модель одним пакетним проходом (predict_batch), за потреби
+        у пулі процесів — і зберігає результати для get_phonetic.
+        Повертає кількість слів.
+        """
+        start = time.perf_counter()
+        # Слова схожої довжини — в одному пакеті (менше доповнення в predict_batch)
+        candidates = sorted(self.g2p_candidates(words), key=lambda w: (len(w), w))
+        batches = [candidates[i:i + batch_size] for i in range(0, len(candidates), batch_size)]
+        if workers > 1 and len(batches) > 1:
+            import multiprocessing
+            with multiprocessing.Pool(workers, initializer=_g2p_worker_init,
+                                      initargs=(self.offline,)) as pool:
+                batch_results = pool.map(_g2p_worker_batch, batches)
+        else:
+            batch_results = [_g2p_batch(self.g2p, batch, self.offline) for batch in batches]
+        for batch, results in zip(batches, batch_results):
+            self.g2p_results.update(zip(batch, results))
+        self.metrics.add(TIER_G2P_BATCH, len(candidates), time.perf_counter() - start)
+        return len(candidates)
 
     def get_unknown_words(self):
         return list(self.unknown)
 
     def analyze_text(self, words):
         return [(w, self.get_phonetic(w)) for w in words]
+
+
+# Слова, які G2p.__call__ передає моделі без змін: один токен лише з літер
+_PLAIN_WORD = re.compile(r"[a-z]+$")
+# Межа довжини вимови, як у G2p.predict
+G2P_MAX_STEPS = 20
+
+
+def _predictable(g2p, word):
+    # Слово, для якого G2p.__call__ викликав би predict (не омограф і не в CMU g2p_en)
+    return (_PLAIN_WORD.match(word) is not None and word not in g2p.homograph2features
+            and word not in g2p.cmu)
+
+
+def predict_batch(g2p, words):
+    """
+    G2p.predict для списку слів одним проходом моделі: кодувальник і
+    декодувальник обробляють усі слова пакета разом (матриці розміром
+    з пакет на кожному кроці), а не кожне слово окремо.
+    """
+    import numpy as np
+    pad, unk, end = g2p.g2idx["<pad>"], g2p.g2idx["<unk>"], g2p.g2idx["</s>"]
+    lengths = np.array([len(w) for w in words])
+    ids = np.full((len(words), lengths.max() + 1), pad, dtype=np.int64)
+    for i, word in enumerate(words):
+        ids[i, :len(word) + 1] = [g2p.g2idx.get(ch, unk) for ch in word] + [end]
+    x = np.take(g2p.enc_emb, ids, axis=0)
+
+    # Кодувальник: прихований стан кожного слова — після його символу </s>
+    h = np.zeros((len(words), g2p.enc_w_hh.shape[-1]), np.float32)
+    last = np.empty_like(h)
+    for t in range(ids.shape[1]):
+        h = g2p.grucell(x[:, t, :], h, g2p.enc_w_ih, g2p.enc_w_hh, g2p.enc_b_ih, g2p.enc_b_hh)
+        finished = lengths == t
+        last[finished] = h[finished]
+
+    # Декодувальник: жадібний, доки кожне слово не дійде до </s> (індекс 3)
+    dec = np.take(g2p.dec_emb, np.full(len(words), 2), axis=0)  # 2: <s>
+    h = last
+    active = np.ones(len(words), dtype=bool)
+    preds = [[] for _ in words]
+    for _ in range(G2P_MAX_STEPS):
+        h = g2p.grucell(dec, h, g2p.dec_w_ih, g2p.dec_w_hh, g2p.dec_b_ih, g2p.dec_b_hh)
+        pred = (np.matmul(h, g2p.fc_w.T) + g2p.fc_b).argmax(axis=1)
+        active &= pred != 3
+        if not active.any():
+            break
+        for i in np.flatnonzero(active):
+            preds[i].append(int(pred[i]))
+        dec = np.take(g2p.dec_emb, pred, axis=0)
+    return [[g2p.idx2p.get(idx, "<unk>") for idx in word_preds] for word_preds in preds]
+
+
+def _g2p_batch(g2p, batch, offline=False):
+    """
+    G2P для пакета слів. Звичайні OOV-слова проходять модель g2p_en разом
+    (predict_batch); решта (апострофи тощо) та моделі без цих
+    внутрішніх методів — через g2p(word) по одному.
+    В офлайн-режимі LookupError (бракує ресурсу NLTK) не ковтається.
+    """
+    predicted = {}
+    if hasattr(g2p, "grucell"):
+        words = [word for word in batch if _predictable(g2p, word)]
+        if words:
+            try:
+                predicted = dict(zip(words, predict_batch(g2p, words)))
+            except Exception:
+                predicted = {}
+    results = []
+    for word in batch:
+        if word in predicted:
+            results.append(predicted[word])
+            continue
+        try:
+            results.append(g2p(word))
+        except LookupError:
+            if offline:
+                raise
+            results.append([])
+        except Exception:
+            results.append([])
+    return results
+
+
+_worker_g2p = None
+_worker_offline = False
+
+
+def _g2p_worker_init(offline=False):
+    global _worker_g2p, _worker_offline
+    _worker_g2p = load_g2p(offline)
+    _worker_offline = offline
+
+
+def _g2p_worker_batch(batch):
+    return _g2p_batch(_worker_g2p, batch, _worker_offline)
@@ -0,0 +1,482 @@
+"""
+Інвертований індекс проаналізованого корпусу (PhoneticIndex.db у вихідній
+папці): для кожного поля та значення — у яких текстах і на яких позиціях
+слів воно трапляється. Поля:
+  phoneme         — фонема без цифри наголосу (ARPAbet; у запитах можна IPA: ʒ)
+  syllable        — склад, як у файлах Syllables (напр. "S-T-R-IY1")
+  cv              — CVV-шаблон будь-якого складу (напр. "CCV")
+  first_syllable  — перший склад слова, як у FirstSyllables
+  first_cv        — CVV-шаблон першого складу, як у FirstSyllablesCVV
+Позиція — номер слова в тексті (з нуля), у тому ж порядку, що й у вихідних файлах.
+
+Усі значення полів — властивості типу слова, тож для кожного тексту
+зберігаються позиції кожного типу слова (таблиця words), а для кожного
+значення — номери типів слів, у яких воно є (таблиця postings). Кілька
+умов перетинаються на рівні типів слів, а позиції читаються лише для результату.
+
+Запити:
+  python phonetic_index.py ВИХІД/PhoneticIndex.db find first_cv=CCV [phoneme=ʒ ...] [--words]
+  python phonetic_index.py ВИХІД/PhoneticIndex.db terms cv
+  python phonetic_index.py ВИХІД/PhoneticIndex.db texts
+"""
+import argparse
+import operator
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from itertools import accumulate
+
+from statistics_calculator import ARPABET_TO_IPA
+
+INDEX_NAME = "PhoneticIndex.db"
+INDEX_VERSION = "1"
+FIELDS = ("phoneme", "syllable", "cv", "first_syllable", "first_cv")
+# Коротші списки зберігаються без zlib (заголовок потоку zlib був би більшим за дані)
+COMPRESS_FROM = 32
+# Не більше стількох параметрів в одному запиті "IN (...)"
+_QUERY_CHUNK = 500
+
+IPA_TO_ARPABET = {ipa: arpabet for arpabet, ipa in ARPABET_TO_IPA.items()}
+
+
+def word_terms(analysis):
+    """
+    Пари (поле, значення) одного слова (WordAnalysis), без повторів.
+    """
+    phonemes, syllables, cvv = analysis.phonemes, analysis.syllables, analysis.cvv
+    terms = {("phoneme", p.rstrip("012")) for p in phonemes}
+    terms.update(("syllable", "-".join(s)) for s in syllables)
+    terms.update(("cv", pattern) for pattern in cvv)
+    if syllables:
+        terms.add(("first_syllable", "-".join(syllables[0])))
+        terms.add(("first_cv", cvv[0]))
+    return tuple(terms)
+
+
+def normalize_term(field, term):
+    if field not in FIELDS:
+        raise ValueError(f"Невідоме поле: {field} (можливі: {', '.join(FIELDS)})")
+    term = term.strip().strip("/")
+    if field == "phoneme":
+        return IPA_TO_ARPABET.get(term, term.upper().rstrip("012"))
+    return term.upper()
+
+
+def encode_numbers(numbers):
+    """
+    Зростаючий список цілих → різниці сусідніх чисел у найвужчому типі
+    (B, H або I; little-endian). Перший байт — тип: велика літера —
+    дані стиснені zlib, мала — ні.
+    """
+    deltas = list(map(operator.sub, numbers, [0] + numbers[:-1]))
+    largest = max(deltas)
+    if largest < 1 << 8:
+        typecode, data = "B", bytes(deltas)
+    else:
+        typecode = "H" if largest < 1 << 16 else "I"
+        values = array(typecode, deltas)
+        if sys.byteorder == "big":
+            values.byteswap()
+        data = values.tobytes()
+    if len(deltas) < COMPRESS_FROM:
+        return typecode.lower().encode("ascii") + data
+    return typecode.encode("ascii") + zlib.compress(data, 1)
+
+
+def decode_numbers(blob):
+    typecode = blob[:1].decode("ascii")
+    data = blob[1:]
+    if typecode.isupper():
+        data = zlib.decompress(data)
+    values = array(typecode.upper())
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return list(accumulate(values))
+
+
+def _connect(path):
+    # Індекс пишуть потоки конвеєра; запис захищено блокуванням IndexWriter
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS texts ("
+        "text_id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, word_count INTEGER NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS words ("
+        "text_id INTEGER NOT NULL, word_id INTEGER NOT NULL, word TEXT NOT NULL, "
+        "count INTEGER NOT NULL, positions BLOB NOT NULL, PRIMARY KEY (text_id, word_id))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS postings ("
+        "field TEXT NOT NULL, term TEXT NOT NULL, text_id INTEGER NOT NULL, "
+        "count INTEGER NOT NULL, word_ids BLOB NOT NULL)"
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS postings_term ON postings (field, term, text_id)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS postings_text ON postings (text_id)")
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                 (INDEX_VERSION,))
+    conn.commit()
+    return conn
+
+
+class TextIndexer:
+    """
+    Позиції типів слів одного тексту. Слова додаються по одному (add),
+    списками (add_words) або готовими частинами від воркерів (merge);
+    значення полів обчислюються один раз на тип слова.
+    index — IndexWriter, у який close() записує текст.
+    """
+    def __init__(self, index=None, name=None):
+        self.index = index
+        self.name = name
+        self.count = 0
+        self.positions = {}
+        self.terms = {}
+
+    def add(self, word, analysis):
+        positions = self.positions.get(word)
+        if positions is None:
+            positions = self.positions[word] = []
+            self.terms[word] = word_terms(analysis)
+        positions.append(self.count)
+        self.count += 1
+
+    def add_words(self, words, analyses):
+        """
+        Кілька слів одразу (words і відповідні WordAnalysis) — швидше за add.
+        """
+        all_positions = self.positions
+        for i, word in enumerate(words, self.count):
+            positions = all_positions.get(word)
+            if positions is None:
+                positions = all_positions[word] = []
+            positions.append(i)
+        analysis_by_word = dict(zip(words, analyses))
+        for word in all_positions:
+            if word not in self.terms:
+                self.terms[word] = word_terms(analysis_by_word[word])
+        self.count += len(words)
+
+    def partial(self):
+        return self.count, self.positions, self.terms
+
+    def merge(self, partial):
+        """
+        Додає частину тексту (partial() іншого TextIndexer) після вже доданих слів.
+        """
+        count, positions, terms = partial
+        offset = self.count
+        for word, word_positions in positions.items():
+            mine = self.positions.get(word)
+            if mine is None:
+                mine = self.positions[word] = []
+                self.terms[word] = terms[word]
+            mine.extend(p + offset for p in word_positions)
+        self.count += count
+
+    def close(self):
+        self.index.store(self.name, self.count, self.positions, self.terms)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+class IndexWriter:
+    """
+    Запис індексу. Повторно доданий текст замінює попередній.
+    append — доповнювати наявний індекс (інкрементальний режим),
+    інакше індекс створюється заново.
+    """
+    def __init__(self, path, append=False):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        if not append and os.path.exists(path):
+            os.remove(path)
+        self.conn = _connect(path)
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM texts WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def open_text(self, name):
+        return TextIndexer(self, name)
+
+    def add_text(self, name, words, analyses):
+        indexer = self.open_text(name)
+        indexer.add_words(words, analyses)
+        indexer.close()
+
+    def store(self, name, word_count, positions, terms):
+        """
+        Записує текст: positions — {слово: позиції}, terms — {слово: word_terms}.
+        """
+        vocabulary = sorted(positions)
+        word_rows = []
+        word_ids = defaultdict(list)
+        term_counts = Counter()
+        for word_id, word in enumerate(vocabulary):
+            word_positions = positions[word]
+            word_rows.append((word_id, word, len(word_positions), encode_numbers(word_positions)))
+            for key in terms[word]:
+                word_ids[key].append(word_id)
+                term_counts[key] += len(word_positions)
+        term_rows = [(field, term, term_counts[field, term], encode_numbers(ids))
+                     for (field, term), ids in word_ids.items()]
+        with self._lock:
+            self._delete(name)
+            text_id = self.conn.execute(
+                "INSERT INTO texts (name, word_count) VALUES (?, ?)", (name, word_count)
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO words (text_id, word_id, word, count, positions) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(text_id,) + row for row in word_rows]
+            )
+            self.conn.executemany(
+                "INSERT INTO postings (field, term, text_id, count, word_ids) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(field, term, text_id, count, blob) for field, term, count, blob in term_rows]
+            )
+            # Кожен текст одразу фіксується: частини воркерів читає батьківський процес
+            self.conn.commit()
+
+    def _delete(self, name):
+        row = self.conn.execute("SELECT text_id FROM texts WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            for table in ("postings", "words", "texts"):
+                self.conn.execute(f"DELETE FROM {table} WHERE text_id = ?", row)
+
+    def append_from(self, part_path, names=None):
+        """
+        Переносить усі тексти іншого індексу (частини воркера) в цей;
+        якщо задано names — лише тексти з цими назвами.
+        """
+        with self._lock:
+            self.conn.execute("ATTACH DATABASE ? AS part", (part_path,))
+            try:
+                if names is not None:
+                    # Решта текстів частини не потрапляє в жоден JOIN нижче
+                    self.conn.execute("CREATE TEMP TABLE keep (name TEXT PRIMARY KEY)")
+                    self.conn.executemany("INSERT OR IGNORE INTO keep VALUES (?)",
+                                          ((name,) for name in names))
+                    self.conn.execute(
+                        "DELETE FROM part.texts WHERE name NOT IN (SELECT name FROM keep)"
+                    )
+                    self.conn.execute("DROP TABLE keep")
+                replaced = "SELECT t.text_id FROM texts t JOIN part.texts p ON p.name = t.name"
+                for table in ("postings", "words"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE text_id IN ({replaced})")
+                self.conn.execute("DELETE FROM texts WHERE name IN (SELECT name FROM part.texts)")
+                self.conn.execute(
+                    "INSERT INTO texts (name, word_count) SELECT name, word_count FROM part.texts"
+                )
+                # Номери текстів у частині інші — зіставляються за назвою
+                mapping = ("JOIN part.texts pt ON pt.text_id = p.text_id "
+                           "JOIN texts t ON t.name = pt.name")
+                self.conn.execute(
+                    "INSERT INTO words (text_id, word_id, word, count, positions) "
+                    "SELECT t.text_id, p.word_id, p.word, p.count, p.positions "
+                    f"FROM part.words p {mapping}"
+                )
+                self.conn.execute(
+                    "INSERT INTO postings (field, term, text_id, count, word_ids) "
+                    "SELECT p.field, p.term, t.text_id, p.count, p.word_ids "
+                    f"FROM part.postings p {mapping}"
+                )
+                self.conn.commit()
+            finally:
+                self.conn.execute("DETACH DATABASE part")
+
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+class PhoneticIndex:
+    """
+    Запити до індексу. Умови — пари (поле, значення); значення
+    нормалізуються (регістр, цифри наголосу фонем, IPA → ARPAbet).
+    """
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+
+    def texts(self):
+        """
+        Пари (назва тексту, кількість слів).
+        """
+        return self.conn.execute("SELECT name, word_count FROM texts ORDER BY name").fetchall()
+
+    def terms(self, field):
+        """
+        Трійки (значення поля, кількість текстів, кількість слів), від найчастішого.
+        """
+        normalize_term(field, "")
+        return self.conn.execute(
+            "SELECT term, COUNT(*), SUM(count) FROM postings WHERE field = ? "
+            "GROUP BY term ORDER BY SUM(count) DESC, term", (field,)
+        ).fetchall()
+
+    def count(self, field, term):
+        """
+        {назва тексту: кількість слів зі значенням}.
+        """
+        return dict(self.conn.execute(
+            "SELECT t.name, p.count FROM postings p JOIN texts t ON t.text_id = p.text_id "
+            "WHERE p.field = ? AND p.term = ?", (field, normalize_term(field, term))
+        ))
+
+    def _word_ids(self, conditions):
+        # {номер тексту: номери типів слів, що задовольняють усі умови}
+        conditions = list(conditions)
+        if not conditions:
+            raise ValueError("Потрібна хоча б одна умова")
+        result = None
+        for field, term in conditions:
+            rows = self.conn.execute(
+                "SELECT text_id, word_ids FROM postings WHERE field = ? AND term = ?",
+                (field, normalize_term(field, term))
+            )
+            if result is None:
+                result = {text_id: set(decode_numbers(blob)) for text_id, blob in rows}
+            else:
+                found = {}
+                for text_id, blob in rows:
+                    if text_id in result:
+                        ids = result[text_id].intersection(decode_numbers(blob))
+                        if ids:
+                            found[text_id] = ids
+                result = found
+            if not result:
+                break
+        return result
+
+    def _word_rows(self, text_id, word_ids, columns):
+        word_ids = sorted(word_ids)
+        for start in range(0, len(word_ids), _QUERY_CHUNK):
+            chunk = word_ids[start:start + _QUERY_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT {columns} FROM words WHERE text_id = ? "
+                f"AND word_id IN ({', '.join('?' * len(chunk))})", [text_id] + chunk
+            )
+            for row in rows:
+                yield row
+
+    def _names(self):
+        return dict(self.conn.execute("SELECT text_id, name FROM texts"))
+
+    def find(self, conditions):
+        """
+        Позиції слів, що задовольняють усі умови одночасно:
+        {назва тексту: відсортовані позиції}. conditions — пари (поле, значення).
+        """
+        matches = self._word_ids(conditions)
+        names = self._names()
+        result = {}
+        for text_id, word_ids in matches.items():
+            positions = []
+            for (blob,) in self._word_rows(text_id, word_ids, "positions"):
+                positions.extend(decode_numbers(blob))
+            positions.sort()
+            result[names[text_id]] = positions
+        return result
+
+    def find_words(self, conditions):
+        """
+        {назва тексту: Counter слів}, що задовольняють усі умови (без читання позицій).
+        """
+        matches = self._word_ids(conditions)
+        names = self._names()
+        return {
+            names[text_id]: Counter(dict(self._word_rows(text_id, word_ids, "word, count")))
+            for text_id, word_ids in matches.items()
+        }
+
+    def postings(self, field, term):
+        return self.find([(field, term)])
+
+    def words(self, name):
+        """
+        Усі слова тексту name у порядку позицій.
+        """
+        row = self.conn.execute(
+            "SELECT text_id, word_count FROM texts WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        words = [None] * row[1]
+        rows = self.conn.execute("SELECT word, positions FROM words WHERE text_id = ?", row[:1])
+        for word, blob in rows:
+            for position in decode_numbers(blob):
+                words[position] = word
+        return words
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def parse_condition(value):
+    field, sep, term = value.partition("=")
+    if not sep or not term:
+        raise ValueError(f"Некоректна умова: {value} (очікується поле=значення)")
+    return field, term
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Запити до фонетичного індексу корпусу")
+    parser.add_argument("index", help=f"файл індексу ({INDEX_NAME})")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+    find = commands.add_parser("find", help="слова, що задовольняють усі умови")
+    find.add_argument("conditions", nargs="+", help="поле=значення, напр. first_cv=CCV")
+    find.add_argument("--words", action="store_true", help="показати знайдені слова")
+    find.add_argument("--top", type=int, default=20, help="скільки слів показувати для тексту")
+    terms = commands.add_parser("terms", help="значення поля за частотою")
+    terms.add_argument("field", choices=FIELDS)
+    terms.add_argument("--top", type=int, default=50)
+    commands.add_parser("texts", help="тексти в індексі")
+    args = parser.parse_args(argv)
+
+    with PhoneticIndex(args.index) as index:
+        if args.command == "texts":
+            for name, word_count in index.texts():
+                print(f"{name}\t{word_count}")
+        elif args.command == "terms":
+            for term, texts, count in index.terms(args.field)[:args.top]:
+                print(f"{term}\t{texts}\t{count}")
+        else:
+            conditions = [parse_condition(value) for value in args.conditions]
+            for name, words in sorted(index.find_words(conditions).items()):
+                print(f"{name}\t{sum(words.values())}")
+                if args.words:
+                    for word, count in words.most_common(args.top):
+                        print(f"  {word}\t{count}")
+
+
+if __name__ == "__main__":
+    cli()
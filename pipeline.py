@@ -0,0 +1,105 @@
+"""
+Будівельні блоки конвеєра читання → аналізу → запису:
+фонове попереднє читання (prefetch) та пул потоків запису
+з обмеженою кількістю незавершених записів (OrderedWriteQueue).
+Обидві черги обмежені, тож швидший етап чекає на повільніший.
+"""
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+def prefetch(items, load, size=2):
+    """
+    Генератор трійок (item, значення, виняток) у порядку items;
+    load(item) виконується у фоновому потоці не більше ніж на size
+    елементів наперед. Якщо споживач зупиниться раніше, потік завершиться.
+    """
+    entries = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                entries.put(entry, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        for item in items:
+            if stop.is_set():
+                return
+            try:
+                entry = (item, load(item), None)
+            except Exception as e:
+                entry = (item, None, e)
+            if not put(entry):
+                return
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            entry = entries.get()
+            if entry is _DONE:
+                return
+            yield entry
+    finally:
+        stop.set()
+        thread.join()
+
+
+class OrderedWriteQueue:
+    """
+    Виконує write(payload) у пулі з threads потоків. Не більше max_pending
+    записів одночасно (інакше submit чекає найстарішого). done(context, error)
+    викликається в потоці, що викликає submit/close, строго в порядку submit.
+    payload None — запис не потрібен, лише done у своїй черзі.
+    """
+    def __init__(self, write, done, threads=2, max_pending=4):
+        self.write = write
+        self.done = done
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._pending = deque()
+
+    def submit(self, payload, context):
+        future = None
+        if payload is not None:
+            future = self._executor.submit(self.write, payload)
+        self._pending.append((future, context))
+        while len(self._pending) > self.max_pending:
+            self._complete_oldest()
+        # Готові записи на початку черги завершуємо одразу
+        while self._pending and (self._pending[0][0] is None or self._pending[0][0].done()):
+            self._complete_oldest()
+
+    def _complete_oldest(self):
+        future, context = self._pending.popleft()
+        error = None
+        if future is not None:
+            try:
+                future.result()
+            except Exception as e:
+                error = e
+        self.done(context, error)
+
+    def close(self):
+        try:
+            while self._pending:
+                self._complete_oldest()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,121 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+class PronunciationCache:
+    """
+    Постійний кеш слово → фонеми на базі SQLite.
+    Для кожного запису зберігається рівень (tier), який дав транскрипцію.
+    Якщо версія лексикону/G2P змінилась, кеш автоматично очищується.
+    Один файл кешу можуть одночасно відкривати кілька процесів (воркери
+    main.py, рушії daemon.py): база працює в режимі WAL (читання не чекають
+    на запис), а нові записи накопичуються в пам'яті й пишуться короткими
+    транзакціями BEGIN IMMEDIATE по commit_every записів.
+    """
+    def __init__(self, path, version, commit_every=1000, timeout=30):
+        self.path = path
+        self.version = version
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Кеш може бути створено в одному потоці, а використовувати в іншому
+        # (daemon.py); одночасно з ним працює лише один потік.
+        # isolation_level=None: транзакції відкриваються явно (_write)
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False,
+                                    isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self._write():
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "word TEXT PRIMARY KEY, phonemes TEXT NOT NULL, tier TEXT NOT NULL)"
+            )
+            self._check_version()
+
+    @contextmanager
+    def _write(self):
+        # Коротка транзакція запису: блокування береться одразу (IMMEDIATE),
+        # тож інші процеси чекають лише на неї, а не на весь файл
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _check_version(self):
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()
+        if row is None or row[0] != self.version:
+            # Інвалідація: лексикон або G2P змінились
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                (self.version,)
+            )
+
+    def get(self, word):
+        pending = self._pending.get(word)
+        if pending is not None:
+            self.hits += 1
+            return json.loads(pending[0]), pending[1]
+        row = self.conn.execute(
+            "SELECT phonemes, tier FROM entries WHERE word = ?", (word,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def __contains__(self, word):
+        # Перевірка без впливу на лічильники влучань/промахів
+        if word in self._pending:
+            return True
+        row = self.conn.execute(
+            "SELECT 1 FROM entries WHERE word = ?", (word,)
+        ).fetchone()
+        return row is not None
+
+    def put(self, word, phonemes, tier):
+        self._pending[word] = (json.dumps(phonemes), tier)
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            rows = [(word, phonemes, tier) for word, (phonemes, tier) in self._pending.items()]
+            with self._write():
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO entries (word, phonemes, tier) VALUES (?, ?, ?)",
+                    rows
+                )
+            self._pending = {}
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __len__(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self),
+        }
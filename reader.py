@@ -1,5 +1,30 @@
+import codecs
+import fnmatch
+import hashlib
+import mmap
 import os
 import re
+import string
+from contextlib import contextmanager
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+# Символи, які можуть входити в токен (див. token_pattern)
+TOKEN_CHARS = frozenset(string.ascii_letters + "'’")
+# Байти, після яких можна різати UTF-8 файл: ASCII (не частина багатобайтового
+# символу), що не входить у токен
+CUT_BYTES = frozenset(b for b in range(128) if chr(b) not in TOKEN_CHARS)
+# Які файли вважаються текстами, якщо include не задано
+DEFAULT_INCLUDE = ["*.txt"]
+# Кодування, які пробуються по черзі: файл, що не є коректним UTF-8,
+# читається як cp1252 (у ньому ’ — байт 0x92)
+DEFAULT_ENCODINGS = ("utf-8", "cp1252")
+# Байт ASCII, що не входить у токен (як CUT_BYTES) — межа вікна потокового читання
+_CUT_PATTERN = re.compile(rb"[\x00-\x26\x28-\x40\x5b-\x60\x7b-\x7f]")
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+# Розмір вікна, яким переглядаються байти файлу
+SCAN_WINDOW = 1 << 20
+# byte_scanner для кожного кодування (None — файл декодується цілком)
+_SCANNERS = {}
 
 class Reader:
     def __init__(self, text):
@@ -9,17 +34,258 @@ class Reader:
     def tokenize(self):
         return self.token_pattern.findall(self.text)
 
+    def iter_tokens(self, chunks):
+        """
+        Токени з ітератора шматків тексту. Текст ріжеться лише по символу,
+        що не може входити в токен, тож токени на межі шматків не розриваються.
+        """
+        tail = ""
+        for chunk in chunks:
+            text = tail + chunk
+            cut = self.safe_cut(text)
+            for token in self.token_pattern.findall(text, 0, cut):
+                yield token
+            tail = text[cut:]
+        if tail:
+            for token in self.token_pattern.findall(tail):
+                yield token
+
+    def safe_cut(self, text):
+        # Позиція після останнього символу, який не є літерою чи апострофом
+        for i in range(len(text) - 1, -1, -1):
+            if text[i] not in TOKEN_CHARS:
+                return i + 1
+        return 0
+
+
+def byte_scanner(encoding):
+    """
+    Пошук токенів прямо в байтах файлу в кодуванні encoding: латинська
+    форма апострофа ’ у цьому кодуванні ("" — якщо його немає) або None,
+    якщо кодування не підходить. Для UTF-8 та однобайтових кодувань,
+    сумісних з ASCII, літери ASCII та апостроф у байтах не можуть бути
+    частиною іншого символу, тож токени ті самі, що й у декодованому тексті.
+    Байти переглядаються як latin-1 (байт = символ, без справжнього
+    декодування); справжнього декодування потребує лише апостроф ’.
+    """
+    if encoding not in _SCANNERS:
+        scanner = None
+        info = codecs.lookup(encoding)
+        single_byte = len(bytes(range(256)).decode(info.name, "replace")) == 256
+        if (info.name == "utf-8" or single_byte) and "Az'".encode(info.name) == b"Az'":
+            try:
+                scanner = "’".encode(info.name).decode("latin-1")
+            except UnicodeEncodeError:
+                scanner = ""
+        _SCANNERS[encoding] = scanner
+    return _SCANNERS[encoding]
+
+
+@contextmanager
+def _mapped(filepath):
+    # Порожній файл не можна відобразити через mmap
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def _detect_encoding(data, encodings):
+    """
+    Перше з encodings, у якому data декодується без помилок (декодований
+    текст не зберігається). Якщо жодне не підходить — UnicodeDecodeError.
+    """
+    if byte_scanner(encodings[0]) is not None and _NON_ASCII.search(data) is None:
+        return encodings[0]
+    error = None
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            for pos in range(0, len(data), SCAN_WINDOW):
+                decoder.decode(data[pos:pos + SCAN_WINDOW])
+            decoder.decode(b"", True)
+            return encoding
+        except UnicodeDecodeError as e:
+            error = e
+        except UnicodeError as e:
+            # Напр., UTF-16 без BOM — теж означає, що кодування не підходить
+            error = UnicodeDecodeError(encoding, b"", 0, 0, str(e))
+    raise error
+
+
+def detect_encoding(filepath, encodings=None):
+    with _mapped(filepath) as data:
+        return _detect_encoding(data, encodings or DEFAULT_ENCODINGS)
+
+
+def _scan_blocks(data, start, end, apostrophe, window=SCAN_WINDOW):
+    """
+    Списки токенів байтів data[start:end] вікнами приблизно по window байтів;
+    вікно закінчується одразу після байта, що не входить у токен.
+    """
+    pattern = Reader("").token_pattern
+    pos = start
+    while pos < end:
+        cut = _CUT_PATTERN.search(data, min(pos + window, end), end)
+        stop = cut.end() if cut else end
+        text = data[pos:stop].decode("latin-1")
+        if apostrophe and apostrophe in text:
+            text = text.replace(apostrophe, "’")
+        yield pattern.findall(text)
+        pos = stop
+
+
+def read_txt_file(filepath, encodings=None):
+    """
+    Токени файлу. Файл відображається в пам'ять (mmap), і токени шукаються
+    прямо в байтах, без декодування всього тексту. encodings — кодування,
+    які пробуються по черзі (за замовчуванням DEFAULT_ENCODINGS).
+    """
+    encodings = encodings or DEFAULT_ENCODINGS
+    with _mapped(filepath) as data:
+        encoding = _detect_encoding(data, encodings)
+        apostrophe = byte_scanner(encoding)
+        if apostrophe is None:
+            text = data[:].decode(encoding)
+        else:
+            tokens = []
+            for block in _scan_blocks(data, 0, len(data), apostrophe):
+                tokens.extend(block)
+            return tokens
+    return Reader(text).tokenize()
+
+
+def stream_txt_file(filepath, chunk_size=DEFAULT_CHUNK_SIZE, encodings=None):
+    """
+    Потокове читання: повертає генератор токенів, який проходить файл
+    вікнами приблизно по chunk_size байтів (пам'ять не залежить від розміру файлу).
+    """
+    # Кодування визначається одразу (UnicodeDecodeError — при виклику)
+    encoding = detect_encoding(filepath, encodings)
+    apostrophe = byte_scanner(encoding)
+    if apostrophe is None:
+        return _stream_decoded(filepath, chunk_size, encoding)
+    return _stream_mapped(filepath, chunk_size, apostrophe)
+
 
-def read_txt_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        text = f.read()
-    reader = Reader(text)
-    return reader.tokenize()
+def _stream_mapped(filepath, chunk_size, apostrophe):
+    with _mapped(filepath) as data:
+        for block in _scan_blocks(data, 0, len(data), apostrophe, chunk_size):
+            for token in block:
+                yield token
+
+
+def _stream_decoded(filepath, chunk_size, encoding):
+    with open(filepath, "r", encoding=encoding) as f:
+        chunks = iter(lambda: f.read(chunk_size), "")
+        for token in Reader("").iter_tokens(chunks):
+            yield token
+
+
+def split_file_chunks(filepath, chunk_size=DEFAULT_CHUNK_SIZE, scan_size=1 << 16):
+    """
+    Межі (start, end) у байтах шматків приблизно по chunk_size байтів.
+    Кожна межа стоїть одразу після байта з CUT_BYTES, тож токени та
+    UTF-8 символи не розриваються, і шматки можна декодувати й
+    токенізувати незалежно (результат — як для всього файлу).
+    """
+    size = os.path.getsize(filepath)
+    bounds = []
+    start = 0
+    with open(filepath, "rb") as f:
+        while start < size:
+            end = size
+            pos = start + chunk_size
+            f.seek(pos)
+            while pos < size:
+                block = f.read(scan_size)
+                cut = next((i for i, b in enumerate(block) if b in CUT_BYTES), -1)
+                if cut >= 0:
+                    end = pos + cut + 1
+                    break
+                pos += len(block)
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def read_chunk_tokens(filepath, start, end, encoding="utf-8"):
+    """
+    Токени шматка [start, end) файлу (межі — з split_file_chunks);
+    encoding — кодування всього файлу (detect_encoding).
+    """
+    apostrophe = byte_scanner(encoding)
+    with _mapped(filepath) as data:
+        if apostrophe is None:
+            return Reader(data[start:end].decode(encoding)).tokenize()
+        tokens = []
+        for block in _scan_blocks(data, start, end, apostrophe):
+            tokens.extend(block)
+        return tokens
 
 
 def get_txt_files_in_folder(folder_path):
-    files = []
-    for fname in os.listdir(folder_path):
-        if fname.lower().endswith('.txt'):
-            files.append(os.path.join(folder_path, fname))
-    return files
+    return discover_files(folder_path)
+
+
+def _matches(relpath, patterns):
+    # Шаблон порівнюється і з відносним шляхом (a/b/*.txt), і з іменем файлу;
+    # без урахування регістру, як і попередня перевірка .txt
+    relpath = relpath.lower()
+    name = relpath.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatchcase(relpath, p.lower()) or fnmatch.fnmatchcase(name, p.lower())
+               for p in patterns)
+
+
+def iter_files(root, recursive=False, include=None, exclude=None):
+    """
+    Генератор пар (відносний шлях через "/", повний шлях) файлів у root
+    через os.scandir. Теки, що відповідають exclude, не обходяться.
+    Порядок не визначено — див. discover_files.
+    """
+    include = include or DEFAULT_INCLUDE
+    exclude = exclude or []
+    stack = [("", root)]
+    while stack:
+        prefix, directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relpath = prefix + entry.name
+                if exclude and _matches(relpath, exclude):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append((relpath + "/", entry.path))
+                elif entry.is_file() and _matches(relpath, include):
+                    yield relpath, entry.path
+
+
+def discover_files(root, recursive=False, include=None, exclude=None):
+    """
+    Список шляхів текстів у root, відсортований за відносним шляхом
+    (однаковий порядок на всіх машинах і при повторних запусках).
+    """
+    found = sorted(iter_files(root, recursive, include, exclude))
+    return [path for _, path in found]
+
+
+def parse_shard(value):
+    """
+    "i/n" → (i, n), де 1 <= i <= n.
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Некоректний шард: {value} (очікується i/n)")
+    if not 1 <= index <= count:
+        raise ValueError(f"Некоректний шард: {value} (потрібно 1 <= i <= n)")
+    return index, count
+
+
+def in_shard(relpath, index, count):
+    # Стабільний хеш відносного шляху: файл потрапляє в той самий шард
+    # незалежно від машини та від того, які ще файли є в корпусі
+    digest = hashlib.sha1(relpath.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count == index - 1
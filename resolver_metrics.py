@@ -0,0 +1,111 @@
+import json
+import os
+from collections import Counter
+
+# Рівні, для яких також запам'ятовуємо самі слова (дорогий шлях і невідомі);
+# лічильник слова — кількість звернень до рівня, а не входжень у тексти
+TRACKED_WORD_TIERS = ("g2p", "unknown")
+
+# Звіт у вихідній папці
+METRICS_NAME = "ResolverMetrics.json"
+
+
+class ResolverMetrics:
+    """
+    Лічильники та сумарна затримка для кожного рівня розпізнавання
+    (загалом і по файлах), а також слова, що дійшли до G2P або UNK.
+    Знімки (snapshot) можна об'єднувати (merge) — напр., з процесів-воркерів.
+    """
+    def __init__(self):
+        self.tiers = {}
+        self.files = {}
+        self.words = {tier: Counter() for tier in TRACKED_WORD_TIERS}
+        self._file = None
+
+    def begin_file(self, name):
+        self._file = self.files.setdefault(name, {})
+
+    def end_file(self):
+        self._file = None
+
+    def record(self, tier, seconds):
+        self.add(tier, 1, seconds)
+
+    def add(self, tier, count, seconds):
+        self._add(self.tiers, tier, count, seconds)
+        if self._file is not None:
+            self._add(self._file, tier, count, seconds)
+
+    def note_word(self, tier, word):
+        """
+        Слово, що дійшло до рівня tier (лише для TRACKED_WORD_TIERS).
+        """
+        if tier in self.words:
+            self.words[tier][word] += 1
+
+    @staticmethod
+    def _add(table, tier, count, seconds):
+        entry = table.get(tier)
+        if entry is None:
+            entry = table[tier] = {"count": 0, "seconds": 0.0}
+        entry["count"] += count
+        entry["seconds"] += seconds
+
+    def unknown_words(self):
+        return sorted(self.words["unknown"])
+
+    def snapshot(self):
+        return {
+            "tiers": self.tiers,
+            "files": self.files,
+            "words": {tier: dict(counter) for tier, counter in self.words.items()},
+        }
+
+    def merge(self, snapshot):
+        for tier, entry in snapshot["tiers"].items():
+            self._add(self.tiers, tier, entry["count"], entry["seconds"])
+        for name, tiers in snapshot["files"].items():
+            table = self.files.setdefault(name, {})
+            for tier, entry in tiers.items():
+                self._add(table, tier, entry["count"], entry["seconds"])
+        for tier, words in snapshot["words"].items():
+            self.words.setdefault(tier, Counter()).update(words)
+
+    def report(self, top=50):
+        def rounded(table):
+            return {
+                tier: {
+                    "count": e["count"],
+                    "seconds": round(e["seconds"], 6),
+                    "avg_ms": round(1000 * e["seconds"] / e["count"], 4) if e["count"] else 0.0,
+                }
+                for tier, e in sorted(table.items())
+            }
+        return {
+            "tiers": rounded(self.tiers),
+            "files": {name: rounded(tiers) for name, tiers in self.files.items()},
+            "g2p_words": dict(self.words["g2p"].most_common(top)),
+            "g2p_distinct": len(self.words["g2p"]),
+            "unknown_words": self.unknown_words(),
+        }
+
+    def write_json(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    def summary_lines(self, top=10):
+        lines = []
+        for tier, e in sorted(self.tiers.items(), key=lambda item: -item[1]["seconds"]):
+            avg = 1000 * e["seconds"] / e["count"] if e["count"] else 0.0
+            lines.append(
+                f"Рівень {tier}: {e['count']} слів, {round(e['seconds'], 3)} сек., "
+                f"{round(avg, 3)} мс/слово"
+            )
+        frequent = self.words["g2p"].most_common(top)
+        if frequent:
+            lines.append("Найчастіші слова через G2P: " +
+                         ", ".join(f"{w} ({n})" for w, n in frequent))
+        return lines
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class RunManifest:
+    """
+    Маніфест у вихідній папці: для кожного вхідного файлу — хеш вмісту
+    та обчислений рядок статистики (і ряд ковзних вікон, якщо рахувався).
+    Незмінені файли при повторному запуску пропускаються. Якщо змінилась
+    версія аналізатора/лексикону, маніфест вважається порожнім.
+    """
+    def __init__(self, output_folder, version):
+        self.path = os.path.join(output_folder, MANIFEST_NAME)
+        self.version = version
+        self.entries = {}
+        self._seen = set()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == version:
+                self.entries = data.get("files", {})
+
+    @staticmethod
+    def key(path):
+        return os.path.abspath(path)
+
+    def lookup(self, path, digest):
+        """
+        Збережений рядок статистики, якщо вміст файлу не змінився, інакше None.
+        """
+        key = self.key(path)
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if entry is not None and entry.get("sha256") == digest:
+            return entry.get("row")
+        return None
+
+    def windows(self, path, params):
+        """
+        Збережені рядки вікон файлу, якщо їх рахували з тими самими
+        параметрами params (WindowSeries.key()), інакше None.
+        Викликається після lookup, який перевіряє хеш.
+        """
+        entry = self.entries.get(self.key(path), {})
+        if entry.get("window") == params:
+            return entry.get("windows")
+        return None
+
+    def update(self, path, digest, row, windows=None, params=None):
+        key = self.key(path)
+        self._seen.add(key)
+        self.entries[key] = {"sha256": digest, "row": row}
+        if windows is not None:
+            self.entries[key].update(window=params, windows=windows)
+
+    def discard(self, path):
+        key = self.key(path)
+        self._seen.add(key)
+        self.entries.pop(key, None)
+
+    def save(self):
+        # Зберігаємо лише файли поточного запуску; запис атомарний
+        files = {k: v for k, v in self.entries.items() if k in self._seen}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "files": files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
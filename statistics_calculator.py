@@ -1,4 +1,6 @@
-from collections import Counter
+import json
+from collections import Counter, deque
+from itertools import chain
 
 # Мапа ARPAbet (без цифри стресу) → IPA
 ARPABET_TO_IPA = {
@@ -15,7 +17,26 @@ ARPABET_TO_IPA = {
     "W": "w",    "Y": "j",   "Z": "z",   "ZH": "ʒ"
 }
 
+def fill_text_fields(row, name, length, phoneme_total, syllable_total):
+    """
+    Додає до рядка статистики поля тексту: назву, довжину, кількість фонем і складів.
+    """
+    row["Text"] = name
+    row["Length"] = length
+    row["PhonemeCount"] = phoneme_total
+    row["SyllablesCount"] = syllable_total
+    if syllable_total:
+        row["AverageSyllables"] = round(phoneme_total / syllable_total, 5)
+    else:
+        row["AverageSyllables"] = 0.0
+    return row
+
+
 class StatisticsCalculator:
+    # Векторизовані бекенди (statistics_numpy) рахують увесь текст одним compute,
+    # решта — накопичувачем по типах слів
+    vectorized = False
+
     def __init__(self, vowels):
         self.vowels = vowels  # ARPAbet-символи голосних із цифрами (наприклад, "AH0", "IH1")
         # Усі можливі IPA-символи, що відповідають ARPAbet
@@ -29,7 +50,10 @@ class StatisticsCalculator:
         c = len(phonemes) - v
         return c, v
 
-    def count_open_closed_syllables(self, syllables):
+    def count_open_closed_syllables(self, syllables, patterns=None):
+        if patterns is not None:
+            open_s = sum(1 for pat in patterns if pat.endswith('V'))
+            return open_s, len(patterns) - open_s
         open_s, closed_s = 0, 0
         for s in syllables:
             last_ph = s[-1].rstrip("012")
@@ -42,14 +66,18 @@ class StatisticsCalculator:
     def get_cvv_structure(self, syllable):
         return ''.join(['V' if self.is_vowel(p) else 'C' for p in syllable])
 
-    def count_cvv_patterns(self, syllables):
+    def count_cvv_patterns(self, syllables, patterns=None):
+        if patterns is not None:
+            return dict(Counter(patterns))
         cvv_counter = Counter()
         for s in syllables:
             pattern = self.get_cvv_structure(s)
             cvv_counter[pattern] += 1
         return dict(cvv_counter)
 
-    def count_first_syllables_patterns(self, syllables_by_word):
+    def count_first_syllables_patterns(self, syllables_by_word, patterns_by_word=None):
+        if patterns_by_word is not None:
+            return dict(Counter(p[0] for p in patterns_by_word if p))
         first_counter = Counter()
         for word_sylls in syllables_by_word:
             if word_sylls:
@@ -65,19 +93,42 @@ class StatisticsCalculator:
         key = phoneme.rstrip("012")
         return ARPABET_TO_IPA.get(key, phoneme)
 
-    def compute(self, phonemes, syllables_flat, syllables_by_word):
+    def compute(self, phonemes, syllables_flat, syllables_by_word, cvv_by_word=None):
+        """
+        cvv_by_word — необов'язкові готові CVV-шаблони складів кожного слова
+        (паралельно до syllables_by_word), щоб не обчислювати їх повторно.
+        """
+        cvv_flat = None
+        if cvv_by_word is not None:
+            cvv_flat = [pat for word_patterns in cvv_by_word for pat in word_patterns]
+
         # 1) Підрахунок приголосних і голосних
-        c, v = self.count_consonants_vowels(phonemes)
+        if cvv_flat is not None:
+            # Склади покривають усі фонеми, тож голосні вже позначені у шаблонах
+            v = sum(pat.count('V') for pat in cvv_flat)
+            c = len(phonemes) - v
+        else:
+            c, v = self.count_consonants_vowels(phonemes)
 
         # 2) Відкриті / закриті склади
-        open_s, closed_s = self.count_open_closed_syllables(syllables_flat)
+        open_s, closed_s = self.count_open_closed_syllables(syllables_flat, cvv_flat)
 
         # 3) CVV-шаблони для всіх складів
-        cvv_patterns = self.count_cvv_patterns(syllables_flat)
-        first_syll_patterns = self.count_first_syllables_patterns(syllables_by_word)
+        cvv_patterns = self.count_cvv_patterns(syllables_flat, cvv_flat)
+        first_syll_patterns = self.count_first_syllables_patterns(syllables_by_word, cvv_by_word)
+
+        # 4) Підрахунок ARPAbet-фонем
+        phoneme_counts = Counter(phonemes)
 
-        
+        return self.build_row(c, v, open_s, closed_s, cvv_patterns, first_syll_patterns,
+                              phoneme_counts, len(phonemes))
 
+    def build_row(self, c, v, open_s, closed_s, cvv_patterns, first_syll_patterns,
+                  phoneme_counts, phoneme_total):
+        """
+        Формує рядок статистики з готових лічильників
+        (спільне для compute і StatisticsAccumulator).
+        """
         # 7) Формуємо результуючий словник у порядку:
         #    1) базові метрики 
         #    2) CVV-шаблони (відсортовані за ключем) 
@@ -100,9 +151,7 @@ class StatisticsCalculator:
         for pat in sorted(first_syll_patterns.keys()):
             result[f"first_{pat}"] = first_syll_patterns[pat]
 
-        # 4) Підрахунок ARPAbet-фонем
-        phoneme_counts = Counter(phonemes)
-        total_phonemes = len(phonemes) if phonemes else 1  # щоб уникнути ділення на нуль
+        total_phonemes = phoneme_total if phoneme_total else 1  # щоб уникнути ділення на нуль
 
         # 5) Конвертація ARPAbet → IPA та підрахунок кількості IPA
         ipa_counts = Counter()
@@ -121,3 +170,299 @@ class StatisticsCalculator:
             result[ipa_sym] = ipa_frequencies[ipa_sym]
 
         return result
+
+    def accumulator(self):
+        return StatisticsAccumulator(self)
+
+
+class StatisticsAccumulator:
+    """
+    Інкрементальний підрахунок статистики слово за словом —
+    без зберігання списків фонем і складів усього тексту.
+    Результат row() збігається з StatisticsCalculator.compute.
+    Частинні накопичувачі (шматки тексту, процеси, машини) об'єднуються
+    через merge — порядок об'єднання не впливає на результат — і
+    серіалізуються в компактний JSON (dumps / loads).
+    """
+    def __init__(self, calculator):
+        self.calculator = calculator
+        self.c = 0
+        self.v = 0
+        self.open_s = 0
+        self.closed_s = 0
+        self.cvv_patterns = Counter()
+        self.first_patterns = Counter()
+        self.phoneme_counts = Counter()
+        self.phoneme_total = 0
+        self.syllable_total = 0
+        self.length = 0
+
+    def add_word(self, phonemes, syllables, cvv=None, length=0, count=1):
+        """
+        length — довжина слова в тексті (символів); count — скільки разів
+        слово трапилось (усі лічильники множаться на count).
+        """
+        if cvv is None:
+            cvv = [self.calculator.get_cvv_structure(s) for s in syllables]
+        # Склади покривають усі фонеми слова, тож голосні рахуємо за шаблонами
+        v = sum(pat.count('V') for pat in cvv)
+        opened = sum(1 for pat in cvv if pat.endswith('V'))
+        self.v += v * count
+        self.c += (len(phonemes) - v) * count
+        self.open_s += opened * count
+        self.closed_s += (len(cvv) - opened) * count
+        self.phoneme_total += len(phonemes) * count
+        self.syllable_total += len(syllables) * count
+        self.length += length * count
+        if count == 1:
+            self.cvv_patterns.update(cvv)
+            self.phoneme_counts.update(phonemes)
+        else:
+            for pat in cvv:
+                self.cvv_patterns[pat] += count
+            for ph in phonemes:
+                self.phoneme_counts[ph] += count
+        if cvv:
+            self.first_patterns[cvv[0]] += count
+
+    def merge(self, other):
+        self.c += other.c
+        self.v += other.v
+        self.open_s += other.open_s
+        self.closed_s += other.closed_s
+        self.cvv_patterns.update(other.cvv_patterns)
+        self.first_patterns.update(other.first_patterns)
+        self.phoneme_counts.update(other.phoneme_counts)
+        self.phoneme_total += other.phoneme_total
+        self.syllable_total += other.syllable_total
+        self.length += other.length
+        return self
+
+    def to_dict(self):
+        return {
+            "c": self.c, "v": self.v, "open": self.open_s, "closed": self.closed_s,
+            "cvv": dict(self.cvv_patterns), "first": dict(self.first_patterns),
+            "phonemes": dict(self.phoneme_counts),
+            "phoneme_total": self.phoneme_total, "syllable_total": self.syllable_total,
+            "length": self.length,
+        }
+
+    @classmethod
+    def from_dict(cls, calculator, data):
+        acc = cls(calculator)
+        acc.c, acc.v = data["c"], data["v"]
+        acc.open_s, acc.closed_s = data["open"], data["closed"]
+        acc.cvv_patterns = Counter(data["cvv"])
+        acc.first_patterns = Counter(data["first"])
+        acc.phoneme_counts = Counter(data["phonemes"])
+        acc.phoneme_total = data["phoneme_total"]
+        acc.syllable_total = data["syllable_total"]
+        acc.length = data["length"]
+        return acc
+
+    def dumps(self):
+        return json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def loads(cls, calculator, text):
+        return cls.from_dict(calculator, json.loads(text))
+
+    def row(self):
+        return self.calculator.build_row(
+            self.c, self.v, self.open_s, self.closed_s,
+            dict(self.cvv_patterns), dict(self.first_patterns),
+            self.phoneme_counts, self.phoneme_total
+        )
+
+    def text_row(self, name):
+        """
+        Повний рядок таблиці статистики для тексту name.
+        """
+        return fill_text_fields(self.row(), name, self.length,
+                                self.phoneme_total, self.syllable_total)
+
+
+def _count_keys(values, words, nested=True):
+    # Лічильник значень values[слово] (або їх елементів, якщо nested) для слів words
+    items = map(values.__getitem__, words)
+    return Counter(chain.from_iterable(items) if nested else items)
+
+
+# Версія формату рядів вікон (змінюється, коли змінюються рядки)
+WINDOW_ROWS_VERSION = 2
+
+
+class WindowStatistics:
+    """
+    Статистика ковзного вікна одного тексту: вікна по window слів із кроком
+    stride слів від початку тексту (рядок кожного вікна — як compute для
+    слів цього вікна). Кожне слово один раз входить у вікно й один раз
+    виходить з нього: лічильники вікна змінюються лише на внесок слів, що
+    увійшли чи вийшли з попереднього оновлення, а не перераховуються, тож
+    вартість лінійна за довжиною тексту незалежно від розміру вікна.
+    Слова після останнього повного вікна дають ще одне, неповне вікно
+    (його колонка Words менша за window); текст, коротший за вікно, —
+    одне неповне вікно з усього тексту.
+    series — WindowSeries, куди close() передає рядки.
+    """
+    def __init__(self, calculator, window, stride=None, series=None, name=None):
+        self.calculator = calculator
+        self.window = window
+        self.stride = stride or window
+        self.series = series
+        self.name = name
+        self.count = 0
+        self.rows = []
+        self._words = deque()
+        self._entering = []
+        self._leaving = []
+        # Фонеми, CVV-шаблони та перший шаблон кожного типу слова
+        self._phonemes = {}
+        self._cvv = {}
+        self._first = {}
+        # Лічильники поточного вікна
+        self.length = 0
+        self.cvv_patterns = Counter()
+        self.first_patterns = Counter()
+        self.phoneme_counts = Counter()
+
+    def _register(self, word, analysis):
+        cvv = analysis.cvv
+        if cvv is None:
+            cvv = [self.calculator.get_cvv_structure(s) for s in analysis.syllables]
+        self._phonemes[word] = analysis.phonemes
+        self._cvv[word] = cvv
+        self._first[word] = cvv[0] if cvv else None
+
+    def add(self, word, analysis):
+        if word not in self._cvv:
+            self._register(word, analysis)
+        self._words.append(word)
+        self._entering.append(word)
+        if len(self._words) > self.window:
+            self._leaving.append(self._words.popleft())
+        self.count += 1
+        start = self.count - self.window
+        if start >= 0 and start % self.stride == 0:
+            self._update()
+            self._emit(start)
+        elif len(self._entering) >= self.window:
+            # Черга змін не більша за вікно (при кроці, більшому за вікно)
+            self._update()
+
+    def add_words(self, words, analyses):
+        """
+        Кілька слів одразу (words і відповідні WordAnalysis) — те саме, що
+        add для кожного, але вікно зсувається зрізами між точками оновлення.
+        """
+        for word, analysis in zip(words, analyses):
+            if word not in self._cvv:
+                self._register(word, analysis)
+        pos = 0
+        while pos < len(words):
+            # Наступна кількість слів, при якій закінчується вікно
+            if self.count < self.window:
+                target = self.window
+            else:
+                target = self.window + ((self.count - self.window) // self.stride + 1) * self.stride
+            take = min(len(words) - pos, target - self.count, self.window - len(self._entering))
+            block = words[pos:pos + take]
+            pos += take
+            self._words.extend(block)
+            self._entering.extend(block)
+            overflow = len(self._words) - self.window
+            if overflow > 0:
+                popleft = self._words.popleft
+                self._leaving.extend([popleft() for _ in range(overflow)])
+            self.count += take
+            if self.count == target:
+                self._update()
+                self._emit(self.count - self.window)
+            elif len(self._entering) >= self.window:
+                self._update()
+
+    def _update(self):
+        entering, leaving = self._entering, self._leaving
+        self._entering, self._leaving = [], []
+        self.length += sum(map(len, entering)) - sum(map(len, leaving))
+        for counter, values, nested in ((self.cvv_patterns, self._cvv, True),
+                                        (self.phoneme_counts, self._phonemes, True),
+                                        (self.first_patterns, self._first, False)):
+            counter.update(_count_keys(values, entering, nested))
+            counter.subtract(_count_keys(values, leaving, nested))
+            # Як і compute, рядок містить лише шаблони, що є у вікні
+            for key in [key for key, value in counter.items() if not value or key is None]:
+                del counter[key]
+
+    def _emit(self, start):
+        # Склади покривають усі фонеми, тож голосні рахуємо за шаблонами (як накопичувач)
+        cvv = self.cvv_patterns
+        v = sum(pat.count('V') * n for pat, n in cvv.items())
+        open_s = sum(n for pat, n in cvv.items() if pat.endswith('V'))
+        syllable_total = sum(cvv.values())
+        phoneme_total = sum(self.phoneme_counts.values())
+        row = self.calculator.build_row(phoneme_total - v, v, open_s, syllable_total - open_s,
+                                        dict(cvv), dict(self.first_patterns),
+                                        self.phoneme_counts, phoneme_total)
+        fill_text_fields(row, self.name, self.length, phoneme_total, syllable_total)
+        # Номер вікна, номери його першого й останнього слова (від 1) та кількість слів
+        row["Window"] = len(self.rows) + 1
+        row["Start"] = start + 1
+        row["End"] = start + len(self._words)
+        row["Words"] = len(self._words)
+        self.rows.append(row)
+
+    def finish(self):
+        """
+        Рядки всіх вікон тексту, разом із завершальним неповним вікном.
+        """
+        if self.count < self.window:
+            start, covered = 0, 0
+        else:
+            last = (self.count - self.window) // self.stride * self.stride
+            start, covered = last + self.stride, last + self.window
+        # Неповне вікно — слова від початку наступного вікна до кінця тексту,
+        # якщо серед них є ще не охоплені жодним вікном
+        if self.count > max(start, covered):
+            popleft = self._words.popleft
+            self._leaving.extend([popleft() for _ in range(len(self._words) - (self.count - start))])
+            self._update()
+            self._emit(start)
+        return self.rows
+
+    def close(self):
+        self.series.put(self.name, self.finish())
+
+
+class WindowSeries:
+    """
+    Ряди ковзних вікон (WindowStatistics) текстів одного запуску. Рядки
+    тексту зберігаються до pop(name): main передає їх в експортер у порядку
+    вхідних файлів, а воркери — батьківському процесу.
+    """
+    def __init__(self, calculator, window, stride=None):
+        if window < 1 or (stride is not None and stride < 1):
+            raise ValueError(f"Некоректне вікно: {window} слів, крок {stride}")
+        self.calculator = calculator
+        self.window = window
+        self.stride = stride or window
+        self.rows = {}
+
+    def key(self):
+        # Параметри вікон (для маніфесту інкрементального режиму); версія
+        # формату рядків відсікає ряди, збережені без неповного вікна
+        return [self.window, self.stride, WINDOW_ROWS_VERSION]
+
+    def open_text(self, name):
+        return WindowStatistics(self.calculator, self.window, self.stride, self, name)
+
+    def add_text(self, name, words, analyses):
+        windows = self.open_text(name)
+        windows.add_words(words, analyses)
+        windows.close()
+
+    def put(self, name, rows):
+        self.rows[name] = rows
+
+    def pop(self, name):
+        return self.rows.pop(name, None)
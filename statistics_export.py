@@ -0,0 +1,250 @@
+"""
+Потоковий експорт таблиці статистики: XLSX (write-only режим openpyxl),
+CSV або Parquet (за наявності pyarrow). Рядки спершу скидаються у тимчасовий
+файл, тож у пам'яті тримається лише поточний рядок, а заголовок містить
+об'єднання колонок з усіх рядків (а не лише з першого).
+"""
+import csv
+import json
+import os
+import re
+import tempfile
+
+from statistics_calculator import ARPABET_TO_IPA
+
+# Ключі, які фіксуємо спочатку
+FIXED_KEYS = ["Text", "Length", "PhonemeCount", "SyllablesCount", "AverageSyllables"]
+# Колонки рядів ковзних вікон (statistics_calculator.WindowStatistics)
+WINDOW_KEYS = ["Window", "Start", "End", "Words"]
+BASE_METRICS = ["Total C", "Total V", "C/V", "Opened", "Closed", "Opened/Closed"]
+IPA_SYMBOLS = sorted(set(ARPABET_TO_IPA.values()))
+CVV_KEY = re.compile(r'^[CV]*$')
+
+# Підсумкові рядки: (підпис у колонці Text, колонка, яку сумуємо)
+TOTAL_ROWS = [
+    ("Total Length", "Length"),
+    ("Total Phonemes", "PhonemeCount"),
+    ("Total Syllables", "SyllablesCount"),
+    ("Total C", "Total C"),
+    ("Total V", "Total V"),
+]
+
+FORMATS = ("xlsx", "csv", "parquet")
+PARQUET_ROW_GROUP = 1000
+
+
+def order_columns(keys):
+    """
+    Порядок колонок: фіксовані, колонки вікон (якщо є), базові метрики, CVV-шаблони (за ключем),
+    шаблони перших складів (за ключем), IPA-символи, решта — у порядку появи.
+    """
+    keys = list(keys)
+    present = set(keys)
+    ipa = set(IPA_SYMBOLS)
+    known = set(FIXED_KEYS) | set(WINDOW_KEYS) | set(BASE_METRICS) | ipa
+    cvv = sorted(k for k in keys if k not in known and CVV_KEY.match(k))
+    first = sorted(k for k in keys if k.startswith("first_"))
+    grouped = set(cvv) | set(first)
+    rest = [k for k in keys if k not in known and k not in grouped]
+    return (
+        FIXED_KEYS
+        + [k for k in WINDOW_KEYS if k in present]
+        + [k for k in BASE_METRICS if k in present]
+        + cvv
+        + first
+        + [k for k in IPA_SYMBOLS if k in present]
+        + rest
+    )
+
+
+def format_from_path(path):
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Невідомий формат статистики: {path} (очікується {', '.join(FORMATS)})")
+    return ext
+
+
+class StatisticsExporter:
+    """
+    Додавання рядків по одному (add) і запис у файл при close().
+    totals — додавати підсумкові рядки (для рядів вікон, що перекриваються,
+    сума не має сенсу).
+    """
+    def __init__(self, path, fmt=None, totals=True):
+        self.path = path
+        self.with_totals = totals
+        self.fmt = fmt or format_from_path(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Невідомий формат статистики: {self.fmt}")
+        self.columns = {}  # упорядкована множина колонок у порядку появи
+        self.float_columns = set()
+        self.totals = {column: 0 for _, column in TOTAL_ROWS}
+        self.count = 0
+        fd, self._spool_path = tempfile.mkstemp(prefix="statistics_", suffix=".jsonl")
+        self._spool = os.fdopen(fd, "w", encoding="utf-8")
+
+    def add(self, row):
+        for key, value in row.items():
+            self.columns.setdefault(key, None)
+            if isinstance(value, float):
+                self.float_columns.add(key)
+        for column in self.totals:
+            self.totals[column] += row.get(column, 0)
+        self._spool.write(json.dumps(row, ensure_ascii=False))
+        self._spool.write("\n")
+        self.count += 1
+
+    def _rows(self):
+        with open(self._spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def _total_rows(self, fieldnames):
+        if not self.with_totals:
+            return
+        idx_text = fieldnames.index("Text")
+        yield [""] * len(fieldnames)
+        for label, column in TOTAL_ROWS:
+            values = [""] * len(fieldnames)
+            values[idx_text] = label
+            if column in fieldnames:
+                values[fieldnames.index(column)] = self.totals[column]
+            yield values
+
+    def close(self):
+        self._spool.close()
+        try:
+            if self.count:
+                fieldnames = order_columns(self.columns)
+                folder = os.path.dirname(self.path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                getattr(self, f"_write_{self.fmt}")(fieldnames)
+        finally:
+            os.remove(self._spool_path)
+
+    def abort(self):
+        """
+        Закриття без запису файлу (напр., після помилки).
+        """
+        self._spool.close()
+        os.remove(self._spool_path)
+
+    def _write_xlsx(self, fieldnames):
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(fieldnames)
+        for row in self._rows():
+            ws.append([row.get(fn, "") for fn in fieldnames])
+        for values in self._total_rows(fieldnames):
+            ws.append(values)
+        wb.save(self.path)
+
+    def _write_csv(self, fieldnames):
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            for row in self._rows():
+                writer.writerow([row.get(fn, "") for fn in fieldnames])
+            for values in self._total_rows(fieldnames):
+                writer.writerow(values)
+
+    def _write_parquet(self, fieldnames):
+        """
+        Колонковий формат: лише рядки текстів, без підсумкових рядків
+        (підсумки легко отримати агрегацією при читанні).
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Для експорту в Parquet потрібен pyarrow: pip install pyarrow")
+
+        def column_type(name):
+            if name == "Text":
+                return pa.string()
+            return pa.float64() if name in self.float_columns else pa.int64()
+
+        schema = pa.schema([(name, column_type(name)) for name in fieldnames])
+        with pq.ParquetWriter(self.path, schema) as pq_writer:
+            batch = []
+            for row in self._rows():
+                batch.append(row)
+                if len(batch) >= PARQUET_ROW_GROUP:
+                    pq_writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    batch = []
+            if batch:
+                pq_writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _csv_value(key, value):
+    if key == "Text":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def read_statistics(path, fmt=None):
+    """
+    Генератор рядків текстів (словників) з таблиці статистики,
+    без порожнього роздільника та підсумкових рядків.
+    """
+    fmt = fmt or format_from_path(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for row in pq.read_table(path).to_pylist():
+            yield {k: v for k, v in row.items() if v is not None}
+        return
+    if fmt == "csv":
+        f = open(path, "r", encoding="utf-8", newline="")
+        rows = csv.reader(f)
+    else:
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+    try:
+        header = next(rows, None)
+        for values in rows:
+            if all(v in (None, "") for v in values):
+                break  # далі йдуть підсумкові рядки
+            row = {}
+            for key, value in zip(header, values):
+                if value not in (None, ""):
+                    row[key] = _csv_value(key, value) if fmt == "csv" else value
+            yield row
+    finally:
+        if fmt == "csv":
+            f.close()
+        else:
+            wb.close()
+
+
+def merge_statistics(paths, out_path, fmt=None):
+    """
+    Об'єднує таблиці статистики шардів в одну з перерахованими підсумками.
+    Рядки йдуть у порядку файлів paths; текст, що трапляється двічі
+    (шарди перетинаються), — помилка. Повертає кількість рядків.
+    """
+    seen = set()
+    exporter = StatisticsExporter(out_path, fmt)
+    try:
+        for path in paths:
+            for row in read_statistics(path):
+                if row["Text"] in seen:
+                    raise ValueError(f"Текст {row['Text']} є в кількох шардах ({path})")
+                seen.add(row["Text"])
+                exporter.add(row)
+    except Exception:
+        exporter.abort()
+        raise
+    exporter.close()
+    return len(seen)
@@ -0,0 +1,158 @@
+"""
+Векторизований (NumPy) бекенд StatisticsCalculator.
+Працює з цілочисловими ID фонем і пласкими масивами зсувів складів
+(див. Syllabifier.syllabify_batch) і повертає той самий рядок статистики.
+"""
+from statistics_calculator import StatisticsCalculator
+from phoneme_codes import PhonemeTable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Шаблони, довші за цю межу, не вміщуються в int64-код і рахуються окремо
+MAX_CODED_SYLLABLE = 62
+
+
+class NumpyStatisticsCalculator(StatisticsCalculator):
+    vectorized = True
+
+    def __init__(self, vowels, table=None):
+        if np is None:
+            raise ImportError("Для NumpyStatisticsCalculator потрібен numpy: pip install numpy")
+        super().__init__(vowels)
+        self.table = table if table is not None else PhonemeTable()
+        self._vowel_flags = np.zeros(0, dtype=bool)
+
+    def _vowel_flags_for(self, size):
+        # Таблиця фонем може рости (нові символи з G2P) — доповнюємо ознаки
+        if len(self._vowel_flags) < size:
+            symbols = self.table.symbols
+            self._vowel_flags = np.array([self.is_vowel(sym) for sym in symbols], dtype=bool)
+        return self._vowel_flags
+
+    def compute(self, phonemes, syllables_flat, syllables_by_word, cvv_by_word=None):
+        """
+        Сумісний з StatisticsCalculator.compute інтерфейс: кодує склади
+        в ID та делегує compute_coded. Склади мають покривати phonemes
+        (як це гарантує Syllabifier.syllabify).
+        """
+        encode = self.table.encode
+        phones = []
+        syllable_offsets = [0]
+        word_offsets = [0]
+        for word_syllables in syllables_by_word:
+            for syllable in word_syllables:
+                phones.extend(encode(syllable))
+                syllable_offsets.append(len(phones))
+            word_offsets.append(len(syllable_offsets) - 1)
+        return self.compute_coded(phones, syllable_offsets, word_offsets)
+
+    def compute_batch(self, batch):
+        return self.compute_coded(batch.phones, batch.syllable_offsets, batch.word_offsets)
+
+    def compute_types(self, codes, counts):
+        """
+        Статистика тексту за типами слів: codes — закодовані слова
+        (WordAnalysis.codes: ID фонем і межі складів у self.table),
+        counts — скільки разів кожен тип трапився в тексті.
+        Слова не перекодовуються: масиви збираються з готових ID.
+        """
+        phones = []
+        syllable_offsets = [0]
+        word_offsets = [0]
+        for ids, bounds in codes:
+            base = len(phones)
+            phones.extend(ids)
+            syllable_offsets.extend([base + end for end in bounds[1:]])
+            word_offsets.append(len(syllable_offsets) - 1)
+        return self.compute_coded(phones, syllable_offsets, word_offsets, counts)
+
+    def compute_coded(self, phones, syllable_offsets, word_offsets, word_counts=None):
+        """
+        word_counts — кратність кожного слова (усі лічильники множаться
+        на неї); None — кожне слово трапилось один раз.
+        """
+        phones = np.asarray(phones, dtype=np.int64)
+        so = np.asarray(syllable_offsets, dtype=np.int64)
+        wo = np.asarray(word_offsets, dtype=np.int64)
+        n_phones = len(phones)
+        n_syll = len(so) - 1
+        lengths = np.diff(so)
+
+        if word_counts is None:
+            word_w = np.ones(len(wo) - 1, dtype=np.int64)
+        else:
+            word_w = np.asarray(word_counts, dtype=np.int64)
+        syll_w = np.repeat(word_w, np.diff(wo))
+        phone_w = np.repeat(syll_w, lengths)
+
+        is_v = self._vowel_flags_for(len(self.table))[phones]
+
+        # 1) Приголосні / голосні
+        v = int(phone_w[is_v].sum())
+        c = int(phone_w.sum()) - v
+
+        # 2) Відкриті / закриті: останній звук складу
+        nonempty = lengths > 0
+        last_v = is_v[so[1:][nonempty] - 1]
+        open_s = int(syll_w[nonempty][last_v].sum())
+        closed_s = int(syll_w.sum()) - open_s
+
+        # 3) Код CVV-шаблону кожного складу: біти V=1 від старшого до молодшого
+        #    плюс маркерний біт довжини (1 << len)
+        syll_index = np.repeat(np.arange(n_syll), lengths)
+        starts = so[:-1]
+        pos = np.arange(n_phones) - starts[syll_index]
+        shift = lengths[syll_index] - 1 - pos
+        coded = lengths <= MAX_CODED_SYLLABLE
+        weights = np.where(
+            coded[syll_index], is_v.astype(np.int64) << np.minimum(shift, MAX_CODED_SYLLABLE), 0
+        )
+        codes = np.zeros(n_syll, dtype=np.int64)
+        if n_phones:
+            codes[nonempty] = np.add.reduceat(weights, starts[nonempty])
+        codes[coded] |= np.left_shift(1, lengths[coded])
+        codes[~coded] = -1
+
+        cvv_patterns = self._histogram(codes, syll_w, np.flatnonzero(~coded), is_v, so)
+
+        # 4) Шаблони перших складів кожного слова
+        has_syllables = wo[1:] > wo[:-1]
+        first_idx = wo[:-1][has_syllables]
+        first_codes = codes[first_idx]
+        first_patterns = self._histogram(
+            first_codes, word_w[has_syllables], np.flatnonzero(first_codes < 0),
+            is_v, so, first_idx
+        )
+
+        # 5) Частоти фонем через bincount за ID
+        if n_phones:
+            counts = np.bincount(phones, weights=phone_w, minlength=len(self.table))
+        else:
+            counts = []
+        symbols = self.table.symbols
+        phoneme_counts = {symbols[i]: int(cnt) for i, cnt in enumerate(counts) if cnt}
+
+        return self.build_row(c, v, open_s, closed_s, cvv_patterns, first_patterns,
+                              phoneme_counts, c + v)
+
+    def _histogram(self, codes, weights, long_syllables, is_v, so, syllables=None):
+        # long_syllables — позиції в codes; syllables — номери складів для них
+        result = {}
+        known = codes >= 0
+        values, inverse = np.unique(codes[known], return_inverse=True)
+        totals = np.bincount(inverse, weights=weights[known], minlength=len(values))
+        for code, cnt in zip(values.tolist(), totals.tolist()):
+            result[self._decode_pattern(code)] = int(cnt)
+        for i in long_syllables.tolist():
+            k = syllables[i] if syllables is not None else i
+            pattern = ''.join('V' if f else 'C' for f in is_v[so[k]:so[k + 1]])
+            result[pattern] = result.get(pattern, 0) + int(weights[i])
+        return result
+
+    @staticmethod
+    def _decode_pattern(code):
+        length = code.bit_length() - 1
+        return ''.join('V' if (code >> (length - 1 - i)) & 1 else 'C' for i in range(length))
@@ -1,4 +1,7 @@
 import re
+from array import array
+
+from phoneme_codes import PhonemeTable
 
 SONORITY = {
     # Vowels
@@ -18,9 +21,55 @@ SONORITY = {
     'P': 0, 'B': 0, 'T': 0, 'D': 0, 'K': 0, 'G': 0
 }
 
+NUCLEUS_PATTERN = re.compile(r'.*[0-2]$')
+
+
+class SyllabifierTable(PhonemeTable):
+    """
+    Таблиця фонем із паралельними масивами ознак за ID:
+    чи є фонема ядром складу та її сонорність.
+    """
+    def __init__(self):
+        self.nucleus = []
+        self.sonority = []
+        super().__init__()
+
+    def _on_new_symbol(self, symbol):
+        self.nucleus.append(bool(NUCLEUS_PATTERN.match(symbol)))
+        self.sonority.append(SONORITY.get(symbol.rstrip('012'), 0))
+
+
+class SyllableBatch:
+    """
+    Результат syllabify_batch у пласких масивах:
+    phones — ID фонем усіх слів підряд;
+    syllable_offsets — початок кожного складу в phones (+ кінцевий зсув);
+    word_offsets — індекс першого складу кожного слова (+ кінцевий зсув).
+    """
+    def __init__(self, table, phones, syllable_offsets, word_offsets):
+        self.table = table
+        self.phones = phones
+        self.syllable_offsets = syllable_offsets
+        self.word_offsets = word_offsets
+
+    def __len__(self):
+        return len(self.word_offsets) - 1
+
+    def word_syllables(self, i):
+        symbols = self.table.symbols
+        so = self.syllable_offsets
+        return [
+            [symbols[p] for p in self.phones[so[k]:so[k + 1]]]
+            for k in range(self.word_offsets[i], self.word_offsets[i + 1])
+        ]
+
+
 class Syllabifier:
     def __init__(self):
-        self.nucleus_pattern = re.compile(r'.*[0-2]$')
+        self.nucleus_pattern = NUCLEUS_PATTERN
+        self.table = SyllabifierTable()
+        # Мемо поділів кластерів приголосних: кортеж ID → точка поділу
+        self._onset_splits = {}
 
     def sonority(self, phone):
         base = phone.rstrip('012')
@@ -42,6 +91,71 @@ class Syllabifier:
         return 0
 
     def syllabify(self, phonemes):
+        return self.syllabify_coded(phonemes)[0]
+
+    def syllabify_coded(self, phonemes):
+        """
+        Те саме, що syllabify, але разом зі складами повертає й закодоване
+        слово: (склади, ID фонем, межі складів) — для векторизованих бекендів.
+        """
+        ids = self.table.encode(phonemes)
+        bounds = self.syllable_bounds(ids)
+        if len(bounds) == 2:
+            return [phonemes], ids, bounds
+        syllables = [phonemes[bounds[k]:bounds[k + 1]] for k in range(len(bounds) - 1)]
+        return syllables, ids, bounds
+
+    def syllable_bounds(self, ids):
+        """
+        Межі складів для слова в ID фонем: [0, кінець_1, ..., len(ids)].
+        Еквівалентно syllabify_reference, але без regex і rstrip на кожну фонему.
+        """
+        nucleus = self.table.nucleus
+        nuclei = [i for i, p in enumerate(ids) if nucleus[p]]
+        bounds = [0]
+        for k in range(len(nuclei) - 1):
+            nuc_idx = nuclei[k]
+            cluster = tuple(ids[nuc_idx + 1: nuclei[k + 1]])
+            split = self._onset_splits.get(cluster)
+            if split is None:
+                split = self._find_onset_split_ids(cluster)
+                self._onset_splits[cluster] = split
+            bounds.append(nuc_idx + 1 + split)
+        bounds.append(len(ids))
+        return bounds
+
+    def _find_onset_split_ids(self, cluster):
+        # Найменша точка поділу, після якої сонорність не спадає
+        if len(cluster) <= 1:
+            return len(cluster)
+        sonority = self.table.sonority
+        j = len(cluster) - 1
+        while j > 0 and sonority[cluster[j - 1]] <= sonority[cluster[j]]:
+            j -= 1
+        return j
+
+    def syllabify_batch(self, words_phonemes):
+        """
+        Поділ на склади багатьох слів одразу; повертає SyllableBatch
+        з пласкими масивами зсувів замість вкладених списків.
+        """
+        phones = array('H')
+        syllable_offsets = array('I', [0])
+        word_offsets = array('I', [0])
+        for phonemes in words_phonemes:
+            ids = self.table.encode(phonemes)
+            base = len(phones)
+            phones.extend(ids)
+            bounds = self.syllable_bounds(ids)
+            for end in bounds[1:]:
+                syllable_offsets.append(base + end)
+            word_offsets.append(len(syllable_offsets) - 1)
+        return SyllableBatch(self.table, phones, syllable_offsets, word_offsets)
+
+    def syllabify_reference(self, phonemes):
+        """
+        Початковий (еталонний) алгоритм на рядках; використовується для перевірки.
+        """
         nuclei = [i for i, p in enumerate(phonemes) if self.nucleus_pattern.match(p)]
         if not nuclei:
             return [phonemes]
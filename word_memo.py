@@ -0,0 +1,75 @@
+from collections import OrderedDict, namedtuple
+
+DEFAULT_MEMO_SIZE = 200000
+
+# Повний результат аналізу одного слова: фонеми, склади, CVV-шаблон
+# кожного складу, рівень, на якому слово отримало транскрипцію, та закодоване
+# слово (ID фонем у таблиці складоподільника, межі складів)
+WordAnalysis = namedtuple("WordAnalysis", ["phonemes", "syllables", "cvv", "tier", "codes"])
+
+# Позначка в метриках: відповідь з WordMemo (як TIER_CACHE для постійного кешу)
+TIER_MEMO = "memo"
+
+
+def cvv_pattern(syllable, vowels):
+    return ''.join('V' if p.rstrip("012") in vowels else 'C' for p in syllable)
+
+
+class WordMemo:
+    """
+    Обмежений LRU-кеш аналізу слів у межах одного запуску.
+    Ключ — нормалізована форма слова, тож кожен тип слова
+    аналізується (фонеми, склади, CVV) лише один раз.
+    Влучання фіксуються в поточних метриках аналізатора (рівень memo та
+    слова G2P/UNK), тож звіт завдання повний і тоді, коли memo зберігся
+    з попередніх завдань чи файлів (daemon.py, воркери).
+    """
+    def __init__(self, analyzer, syllabifier, vowels, maxsize=DEFAULT_MEMO_SIZE):
+        self.analyzer = analyzer
+        self.syllabifier = syllabifier
+        self.vowels = vowels
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def analyze(self, word):
+        key = self.analyzer.normalize(word)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            metrics = self.analyzer.metrics
+            metrics.add(TIER_MEMO, 1, 0.0)
+            # Слово G2P/UNK фіксується один раз на метрики — як і без memo,
+            # коли аналізатор викликається для слова лише раз
+            tracked = metrics.words.get(entry.tier)
+            if tracked is not None and key not in tracked:
+                metrics.note_word(entry.tier, key)
+            return entry
+
+        self.misses += 1
+        phonemes, tier = self.analyzer.resolve(key)
+        syllables, ids, bounds = self.syllabifier.syllabify_coded(phonemes)
+        cvv = [cvv_pattern(s, self.vowels) for s in syllables]
+        entry = WordAnalysis(phonemes, syllables, cvv, tier, (ids, bounds))
+        if self.maxsize > 0:
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._entries),
+        }